@@ -0,0 +1,172 @@
+"""
+쓰기 시점 예산 임계값 판단과 알림 이벤트 전달
+
+지출 생성/수정/삭제가 집계(expense_rollups)를 바꾸면 apply_deltas가 돌려준
+(반영 전, 반영 후) 합계로 해당 카테고리의 월/연 예산 사용률이 임계값을
+넘었는지 판단합니다. 넘은 경우 이벤트를 사용자별 최근 이력에 기록하고
+SSE로 구독 중인 클라이언트에 바로 보냅니다. 구독만 하고 있는 클라이언트는
+데이터베이스를 조회하지 않습니다.
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime, timezone
+from cache import cache
+from category_codes import load_dictionary
+from rollup import fetch_rollups
+
+ALERT_THRESHOLDS = sorted(
+    float(t) for t in os.getenv("BUDGET_ALERT_THRESHOLDS", "80,100").split(",") if t.strip()
+)
+ALERT_HISTORY = int(os.getenv("ALERT_HISTORY", "100"))
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+
+class AlertHub:
+    def __init__(self, history=ALERT_HISTORY):
+        self.history = history
+        self._events = {}       # user_id -> 최근 이벤트 deque
+        self._subscribers = {}  # user_id -> 구독 큐 집합
+        self._last_id = 0
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, user_id, event):
+        """이벤트 기록 후 구독자에게 전달"""
+        self._last_id += 1
+        event = {"id": self._last_id, **event}
+        self._events.setdefault(user_id, deque(maxlen=self.history)).append(event)
+        for queue in self._subscribers.get(user_id, ()):
+            # 느린 구독자는 가장 오래된 이벤트를 버림 (재접속 시 이력으로 복구)
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        return event
+
+    def events_since(self, user_id, last_id=0):
+        """last_id 이후 기록된 이벤트 (서버 재시작 전 id면 전체 이력)"""
+        if last_id > self._last_id:
+            last_id = 0
+        return [event for event in self._events.get(user_id, ()) if event["id"] > last_id]
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=self.history)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def stats(self):
+        return {
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "users": len(self._events),
+            "last_event_id": self._last_id,
+        }
+
+# 전역 알림 허브
+hub = AlertHub()
+
+def format_sse(event):
+    """이벤트를 text/event-stream 형식으로 변환"""
+    return f"id: {event['id']}\nevent: budget_alert\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+async def load_period_budgets(db, user_id, year, month=None):
+    """기간 예산 목록 (month가 없으면 연간 예산) - 캐시 사용"""
+    async def load():
+        query = db.table("budgets")\
+            .select("*")\
+            .eq("user_id", user_id)\
+            .eq("year", year)
+
+        if month:
+            query = query.eq("period", "monthly").eq("month", month)
+        else:
+            query = query.eq("period", "yearly")
+
+        return (await query.execute()).data
+
+    return await cache.get_or_load("budgets", user_id, ("status", year, month), load)
+
+def _crossing_event(budget, category, before, after):
+    """사용률이 임계값을 아래에서 위로 넘었으면 가장 높은 임계값의 이벤트 생성"""
+    budget_amount = float(budget["amount"])
+    if budget_amount <= 0:
+        return None
+    before_pct = before / budget_amount * 100
+    after_pct = after / budget_amount * 100
+    crossed = [t for t in ALERT_THRESHOLDS if before_pct < t <= after_pct]
+    if not crossed:
+        return None
+
+    usage_percentage = round(after_pct, 2)
+    return {
+        "type": "over_budget" if after > budget_amount else "warning",
+        "category": category,
+        "period": budget["period"],
+        "year": budget["year"],
+        "month": budget.get("month"),
+        "threshold": crossed[-1],
+        "budget_amount": budget_amount,
+        "spent_amount": after,
+        "usage_percentage": usage_percentage,
+        "message": f"{category} 카테고리가 예산의 {usage_percentage:.1f}%를 사용했습니다.",
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+async def evaluate_thresholds(db, user_id, changes):
+    """집계 변화 {(year, month, category_id): (이전 합계, 이후 합계)}로 임계값 통과 이벤트 발행
+
+    월 예산은 변화량만으로 판단하고, 연 예산은 해당 카테고리의 연간 집계(최대 12행)만 읽습니다.
+    """
+    changes = {key: totals for key, totals in changes.items() if totals[0] != totals[1]}
+    if not changes:
+        return []
+
+    try:
+        years = list(dict.fromkeys(year for year, _, _ in changes))
+        periods = list(dict.fromkeys([(year, month) for year, month, _ in changes] + [(year, None) for year in years]))
+        budget_lists = await asyncio.gather(
+            *[load_period_budgets(db, user_id, year, month) for year, month in periods]
+        )
+        budgets = {
+            (year, month, budget["category_id"]): budget
+            for (year, month), period_budgets in zip(periods, budget_lists)
+            for budget in period_budgets
+        }
+
+        dictionary = await load_dictionary(db, user_id)
+
+        events = []
+        yearly_deltas = {}
+        for (year, month, category_id), (before, after) in changes.items():
+            budget = budgets.get((year, month, category_id))
+            if budget:
+                events.append(_crossing_event(budget, dictionary.name(category_id), before, after))
+            if (year, None, category_id) in budgets:
+                yearly_deltas[(year, category_id)] = yearly_deltas.get((year, category_id), 0) + after - before
+
+        if yearly_deltas:
+            year_rows = await asyncio.gather(*[
+                fetch_rollups(db, user_id, year, category_id=category_id, columns="total_amount")
+                for year, category_id in yearly_deltas
+            ])
+            for (year, category_id), rows in zip(yearly_deltas, year_rows):
+                after = sum(float(row["total_amount"]) for row in rows)
+                events.append(_crossing_event(
+                    budgets[(year, None, category_id)], dictionary.name(category_id),
+                    after - yearly_deltas[(year, category_id)], after
+                ))
+
+        return [hub.publish(user_id, event) for event in events if event]
+    except Exception as e:
+        # 알림 실패로 지출 저장 요청을 실패시키지 않음
+        print(f"Budget threshold error: {e}")
+        return []
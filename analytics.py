@@ -0,0 +1,335 @@
+"""
+NumPy 기반 열 지향 지출 분석 엔진
+
+사용자 지출을 dict 목록 대신 열 배열로 보관하고, 요약은 np.bincount 그룹 합산으로 계산합니다.
+    days     int32    1970-01-01 기준 일 번호 (오름차순 정렬)
+    amounts  float64  금액
+    counts   int64    건수 (지출 원본은 1, 월간 집계 행은 그 달의 건수)
+    codes    int32    프레임 내 카테고리 번호 (categories[code]가 이름)
+
+카테고리는 DB의 정수 코드(category_id)로 읽어 번호를 매기고, 이름은 생성 시 받은
+{코드: 이름} 사전으로 붙입니다. 카테고리 이름이 바뀌면 'analytics' 캐시도 무효화해야 합니다.
+
+같은 엔진이 지출 원본과 월간 집계(expense_rollups) 행을 모두 처리하므로 기존 요약 API는
+가벼운 집계 행으로, 백분위수/이동 평균/요일 분석은 일 단위 원본 프레임으로 계산합니다.
+"""
+
+import asyncio
+import numpy as np
+from cache import cache
+from capabilities import get_capabilities
+from category_codes import load_dictionary
+from rollup import fetch_rollups
+
+# 원본 로딩 시 한 번에 읽을 행 수 (PostgREST 기본 최대 행 수)
+PAGE_SIZE = 1000
+
+WEEKDAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+
+GRANULARITIES = ("day", "week", "month", "quarter", "year")
+
+def to_day_numbers(dates):
+    """'YYYY-MM-DD' 문자열 목록을 일 번호(int32) 배열로 변환"""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int32)
+
+def day_to_iso(day):
+    return str(np.datetime64(int(day), "D"))
+
+def period_bounds(year, month=None):
+    """연(월) 기간을 일 번호 [start, end)로 변환"""
+    if month:
+        start = np.datetime64(f"{year}-{month:02d}", "M")
+        end = start + 1
+    else:
+        start = np.datetime64(str(year), "Y").astype("datetime64[M]")
+        end = start + 12
+    return int(start.astype("datetime64[D]").astype(np.int32)), int(end.astype("datetime64[D]").astype(np.int32))
+
+def bucket_numbers(days, granularity):
+    """일 번호 배열을 기간 단위 구간 번호로 변환 (주는 월요일 시작)"""
+    days = np.asarray(days).astype(np.int64)
+    if granularity == "day":
+        return days
+    if granularity == "week":
+        # 1970-01-01(목요일)이 속한 주의 월요일은 -3일
+        return (days + 3) // 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    if granularity == "month":
+        return months
+    if granularity == "quarter":
+        return months // 3
+    return months // 12
+
+def bucket_info(bucket, granularity):
+    """구간 번호의 (표시 이름, 시작일)"""
+    if granularity == "day":
+        start = day_to_iso(bucket)
+        return start, start
+    if granularity == "week":
+        start = day_to_iso(bucket * 7 - 3)
+        return start, start
+    months = {"month": 1, "quarter": 3, "year": 12}[granularity]
+    start = np.datetime64(int(bucket * months), "M")
+    year, month = 1970 + bucket * months // 12, bucket * months % 12 + 1
+    label = {
+        "month": f"{year}-{month:02d}",
+        "quarter": f"{year}-Q{(month - 1) // 3 + 1}",
+        "year": str(year),
+    }[granularity]
+    return label, str(start.astype("datetime64[D]"))
+
+class ExpenseFrame:
+    def __init__(self, days, amounts, counts, codes, categories, daily=True):
+        # 인자로 받는 배열은 days 오름차순으로 정렬되어 있어야 함 (from_* 생성자가 보장)
+        self.days = days
+        self.amounts = amounts
+        self.counts = counts
+        self.codes = codes
+        self.categories = categories
+        self.daily = daily
+
+    @classmethod
+    def _build(cls, days, amounts, counts, rows, names, daily):
+        category_ids = np.fromiter((row["category_id"] for row in rows), dtype=np.int64, count=len(rows))
+        uniques, codes = np.unique(category_ids, return_inverse=True)
+        order = np.argsort(days, kind="stable")
+        return cls(
+            days[order],
+            amounts[order],
+            counts[order],
+            codes.astype(np.int32)[order],
+            [names.get(category_id, str(category_id)) for category_id in uniques.tolist()],
+            daily
+        )
+
+    @classmethod
+    def from_expenses(cls, rows, names):
+        """지출 행(date, amount, category_id)과 {코드: 이름}으로 일 단위 프레임 생성"""
+        days = to_day_numbers([row["date"][:10] for row in rows])
+        amounts = np.fromiter((float(row["amount"]) for row in rows), dtype=np.float64, count=len(rows))
+        counts = np.ones(len(rows), dtype=np.int64)
+        return cls._build(days, amounts, counts, rows, names, daily=True)
+
+    @classmethod
+    def from_rollups(cls, rows, names):
+        """월간 집계 행(year, month, category_id, total_amount, count)과 {코드: 이름}으로 월 단위 프레임 생성"""
+        days = to_day_numbers([f"{row['year']}-{int(row['month']):02d}-01" for row in rows])
+        amounts = np.fromiter((float(row["total_amount"]) for row in rows), dtype=np.float64, count=len(rows))
+        counts = np.fromiter((int(row["count"]) for row in rows), dtype=np.int64, count=len(rows))
+        return cls._build(days, amounts, counts, rows, names, daily=False)
+
+    def __len__(self):
+        return len(self.days)
+
+    def _take(self, index):
+        return ExpenseFrame(
+            self.days[index],
+            self.amounts[index],
+            self.counts[index],
+            self.codes[index],
+            self.categories,
+            self.daily
+        )
+
+    def _months(self):
+        """1970-01 기준 월 번호"""
+        return self.days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int32)
+
+    def _require_daily(self):
+        if not self.daily:
+            raise ValueError("일 단위 분석은 지출 원본 프레임에서만 사용할 수 있습니다.")
+
+    def slice_period(self, year=None, month=None):
+        """연/월 조건으로 자른 프레임 (연도 없이 월만 지정하면 모든 연도의 해당 월)"""
+        if year:
+            start, end = period_bounds(year, month)
+            lo, hi = np.searchsorted(self.days, [start, end])
+            return self._take(slice(lo, hi))
+        if month:
+            return self._take(self._months() % 12 + 1 == month)
+        return self
+
+    def slice_days(self, start, end):
+        """일 번호 [start, end] 구간으로 자른 프레임"""
+        lo, hi = np.searchsorted(self.days, [start, end + 1])
+        return self._take(slice(lo, hi))
+
+    def totals_by_category(self):
+        """{카테고리: {'total_amount', 'count'}}"""
+        size = len(self.categories)
+        totals = np.bincount(self.codes, weights=self.amounts, minlength=size)
+        counts = np.bincount(self.codes, weights=self.counts, minlength=size).astype(np.int64)
+        return {
+            self.categories[code]: {"total_amount": float(totals[code]), "count": int(counts[code])}
+            for code in np.flatnonzero(counts)
+        }
+
+    def totals_by_month(self):
+        """{'YYYY-MM': 합계} (월 오름차순)"""
+        months, inverse = np.unique(self._months(), return_inverse=True)
+        totals = np.bincount(inverse, weights=self.amounts, minlength=len(months))
+        return {
+            f"{1970 + month // 12}-{month % 12 + 1:02d}": float(total)
+            for month, total in zip(months.tolist(), totals)
+        }
+
+    def time_buckets(self, start, end, granularity="month", by_category=False):
+        """일 번호 [start, end]를 기간 단위로 나눈 합계/건수 (빈 구간도 0으로 채움)
+
+        월/분기/연 단위는 월간 집계 프레임으로도 계산할 수 있습니다.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"지원하지 않는 기간 단위입니다: {granularity}")
+        if granularity in ("day", "week"):
+            self._require_daily()
+
+        frame = self.slice_days(start, end)
+        first, last = bucket_numbers([start, end], granularity).tolist()
+        size = last - first + 1
+        index = bucket_numbers(frame.days, granularity) - first
+
+        totals = np.bincount(index, weights=frame.amounts, minlength=size)
+        counts = np.bincount(index, weights=frame.counts, minlength=size).astype(np.int64)
+
+        if by_category:
+            width = len(self.categories)
+            flat = index * width + frame.codes
+            category_totals = np.bincount(flat, weights=frame.amounts, minlength=size * width).reshape(size, width)
+            category_counts = np.bincount(flat, weights=frame.counts, minlength=size * width)\
+                .astype(np.int64).reshape(size, width)
+            # 기간 안에 지출이 있는 카테고리만 포함
+            used = np.flatnonzero(category_counts.sum(axis=0))
+
+        buckets = []
+        for i in range(size):
+            label, bucket_start = bucket_info(first + i, granularity)
+            bucket = {
+                "period": label,
+                "start_date": bucket_start,
+                "total_amount": float(totals[i]),
+                "count": int(counts[i])
+            }
+            if by_category:
+                bucket["categories"] = {
+                    self.categories[code]: {
+                        "total_amount": float(category_totals[i, code]),
+                        "count": int(category_counts[i, code])
+                    }
+                    for code in used
+                }
+            buckets.append(bucket)
+        return buckets
+
+    def category_percentiles(self, percentiles=(25, 50, 75, 90)):
+        """카테고리별 금액 분포 (최소/최대/평균/백분위수)"""
+        self._require_daily()
+        order = np.lexsort((self.amounts, self.codes))
+        codes = self.codes[order]
+        amounts = self.amounts[order]
+        bounds = np.searchsorted(codes, np.arange(len(self.categories) + 1))
+
+        result = []
+        for code, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            if lo == hi:
+                continue
+            values = amounts[lo:hi]
+            result.append({
+                "category": self.categories[code],
+                "count": int(hi - lo),
+                "total_amount": float(values.sum()),
+                "min_amount": float(values[0]),
+                "max_amount": float(values[-1]),
+                "avg_amount": float(values.mean()),
+                "percentiles": {
+                    f"p{q:g}": float(v) for q, v in zip(percentiles, np.percentile(values, percentiles))
+                }
+            })
+        result.sort(key=lambda x: x["total_amount"], reverse=True)
+        return result
+
+    def rolling_daily(self, start, end, windows=(7, 30)):
+        """일 번호 [start, end]의 일별 합계와 이동 평균 (지출 없는 날은 0으로 계산)"""
+        self._require_daily()
+        longest = max(windows)
+        base = start - longest + 1
+        window_frame = self.slice_days(base, end)
+        daily = np.bincount(
+            window_frame.days - base, weights=window_frame.amounts, minlength=end - base + 1
+        )
+        cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+
+        averages = {}
+        for window in windows:
+            # 끝나는 날이 start..end인 구간 합: cumulative[i + 1] - cumulative[i + 1 - window]
+            ends = np.arange(longest, end - base + 2)
+            averages[f"avg_{window}d"] = (cumulative[ends] - cumulative[ends - window]) / window
+
+        return [
+            {
+                "date": day_to_iso(start + i),
+                "total_amount": float(daily[longest - 1 + i]),
+                **{name: round(float(values[i]), 2) for name, values in averages.items()}
+            }
+            for i in range(end - start + 1)
+        ]
+
+    def by_weekday(self):
+        """요일별 합계/건수/평균 (월요일=0)"""
+        self._require_daily()
+        # 1970-01-01은 목요일
+        weekdays = (self.days.astype(np.int64) + 3) % 7
+        totals = np.bincount(weekdays, weights=self.amounts, minlength=7)
+        counts = np.bincount(weekdays, minlength=7)
+        active_days = np.bincount((np.unique(self.days).astype(np.int64) + 3) % 7, minlength=7)
+        return [
+            {
+                "weekday": day,
+                "name": WEEKDAY_NAMES[day],
+                "total_amount": float(totals[day]),
+                "count": int(counts[day]),
+                "avg_amount": float(totals[day] / counts[day]) if counts[day] else 0,
+                "avg_daily_amount": float(totals[day] / active_days[day]) if active_days[day] else 0
+            }
+            for day in range(7)
+        ]
+
+async def load_expense_frame(db, user_id, year=None, month=None):
+    """사용자 지출 원본 프레임 (캐시 사용, 지출 쓰기/카테고리 이름 변경 시 'analytics' 무효화)
+
+    year를 주면 그 연(월)의 날짜 범위 조건을 DB에서 적용해 해당 기간의 행만 읽습니다.
+    연도 없이 월만 지정하는 조건은 범위로 표현할 수 없으므로 전체를 읽고 slice_period로 거릅니다.
+    """
+    period = period_bounds(year, month) if year else None
+
+    async def load():
+        rows = []
+        last_id = None
+        while True:
+            query = db.table("expenses").select("id, date, amount, category_id").eq("user_id", user_id)
+            if period:
+                query = query.gte("date", day_to_iso(period[0])).lt("date", day_to_iso(period[1]))
+            if last_id:
+                query = query.gt("id", last_id)
+            page = (await query.order("id").limit(PAGE_SIZE).execute()).data
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            last_id = page[-1]["id"]
+        dictionary = await load_dictionary(db, user_id)
+        return ExpenseFrame.from_expenses(rows, dictionary.by_code)
+
+    key = ("expenses", year, month) if period else ("expenses",)
+    return await cache.get_or_load("analytics", user_id, key, load)
+
+async def load_period_frame(db, user_id, year=None, month=None):
+    """기간 요약용 프레임 - 월간 집계 테이블이 있으면 집계 행, 없으면 기간 조건을 DB에서 적용한 지출 원본
+
+    월은 연도와 함께 지정된 경우에만 적용합니다.
+    """
+    if (await get_capabilities(db))["expense_rollups"]:
+        rollups, dictionary = await asyncio.gather(
+            fetch_rollups(db, user_id, year, month if year else None, "year, month, category_id, total_amount, count"),
+            load_dictionary(db, user_id)
+        )
+        return ExpenseFrame.from_rollups(rollups, dictionary.by_code)
+    return await load_expense_frame(db, user_id, year, month if year else None)
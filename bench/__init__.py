@@ -0,0 +1,10 @@
+"""
+성능 측정 도구 (로컬 SQLite 백엔드 기준)
+
+    python -m bench.datagen --db bench.db --users 20 --expenses 5000 --years 3
+    python -m bench.load --db bench.db --concurrency 16 --requests 200
+    python -m bench.micro --expenses 200000
+    python -m bench.compare bench/results/이전.json bench/results/이후.json
+
+결과는 bench/results/ 아래 JSON 파일로 저장되며 compare로 두 실행을 비교합니다.
+"""
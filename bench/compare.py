@@ -0,0 +1,84 @@
+"""
+두 벤치마크 결과 비교
+
+    python -m bench.compare bench/results/load-이전.json bench/results/load-이후.json
+
+부하 결과는 엔드포인트별 p50/p95/p99와 처리량을, 마이크로 결과는 항목별 중앙값을
+나란히 보여주고 변화율(%)을 붙입니다. --threshold 이상 느려진 항목이 있으면 종료 코드 1.
+"""
+
+import argparse
+import json
+import sys
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def change(before, after):
+    """변화율 (%) - 기준값이 0이면 None"""
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+def _format_change(value):
+    return "     -" if value is None else f"{value:+6.1f}%"
+
+def metrics(data):
+    """결과 파일 → {항목: {지표: (값, 클수록 좋은지)}}"""
+    if data["meta"]["kind"] == "micro":
+        return {
+            name: {"median_ms": (stats["median_ms"], False)}
+            for name, stats in data["benchmarks"].items()
+        }
+    return {
+        name: {
+            "p50": (stats["latency_ms"]["p50"], False),
+            "p95": (stats["latency_ms"]["p95"], False),
+            "p99": (stats["latency_ms"]["p99"], False),
+            "rps": (stats["throughput_rps"], True),
+        }
+        for name, stats in data["endpoints"].items()
+    }
+
+def compare(before, after, threshold):
+    """비교 표 출력 - 반환값: threshold 이상 느려진 (항목, 지표) 목록"""
+    if before["meta"]["kind"] != after["meta"]["kind"]:
+        raise SystemExit(f"결과 종류가 다릅니다: {before['meta']['kind']} / {after['meta']['kind']}")
+
+    old, new = metrics(before), metrics(after)
+    print(f"기준: {before['meta'].get('git_commit')} ({before['meta'].get('started_at')})")
+    print(f"비교: {after['meta'].get('git_commit')} ({after['meta'].get('started_at')})")
+
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        cells = []
+        for metric, (value, higher_is_better) in new[name].items():
+            base = old[name][metric][0]
+            delta = change(base, value)
+            cells.append(f"{metric} {base:>9.2f} → {value:>9.2f} {_format_change(delta)}")
+            if delta is not None and (-delta if higher_is_better else delta) >= threshold:
+                regressions.append((name, metric))
+        print(f"  {name:<40} " + "  ".join(cells))
+
+    for name in sorted(old.keys() - new.keys()):
+        print(f"  {name:<40} (비교 결과에 없음)")
+    for name in sorted(new.keys() - old.keys()):
+        print(f"  {name:<40} (새 항목)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 결과 두 개 비교")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="회귀로 볼 변화율 (%%, 기본값 10)")
+    args = parser.parse_args()
+
+    regressions = compare(load(args.before), load(args.after), args.threshold)
+    if regressions:
+        print(f"⚠️  {args.threshold:g}% 이상 느려짐: " + ", ".join(f"{n} {m}" for n, m in regressions))
+        sys.exit(1)
+    print("✅ 회귀 없음")
+
+if __name__ == "__main__":
+    main()
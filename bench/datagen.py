@@ -0,0 +1,164 @@
+"""
+합성 데이터 생성기
+
+사용자 N명 × 지출 M건을 여러 해에 걸쳐 만들어 로컬 SQLite 백엔드에 넣습니다.
+카테고리 빈도와 금액 분포는 실제 가계부처럼 치우치게 만들고(식비/교통비가 대부분,
+주거비는 월 1회 큰 금액), 같은 seed면 항상 같은 데이터가 만들어집니다.
+
+    python -m bench.datagen --db bench.db --users 20 --expenses 5000 --years 3 --seed 42
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import date, timedelta
+import numpy as np
+
+# 카테고리: (이름, 색상, 빈도 가중치, 금액 중앙값(원), 금액 분산(로그 표준편차))
+CATEGORIES = [
+    ("식비", "#EF4444", 40, 9000, 0.6),
+    ("교통비", "#3B82F6", 22, 2500, 0.5),
+    ("쇼핑", "#10B981", 12, 35000, 0.9),
+    ("문화생활", "#8B5CF6", 8, 15000, 0.7),
+    ("의료비", "#F59E0B", 5, 20000, 0.8),
+    ("교육", "#06B6D4", 4, 60000, 0.7),
+    ("기타", "#6B7280", 7, 12000, 1.0),
+]
+
+# 주거비는 매달 초에 한 번 (사용자마다 고정 금액)
+HOUSING = ("주거비", "#84CC16")
+
+# 식비/문화생활은 주말에 더 자주 발생
+WEEKEND_BOOST = {"식비": 1.5, "문화생활": 2.0}
+
+INSERT_CHUNK = 5000
+
+def bench_user(index):
+    return f"bench-user-{index:04d}"
+
+def _expense_rows(rng, expenses, start, days):
+    """한 사용자의 (날짜, 카테고리, 금액) 배열"""
+    names = [c[0] for c in CATEGORIES]
+    weights = np.array([c[2] for c in CATEGORIES], dtype=float)
+
+    offsets = rng.integers(0, days, size=expenses)
+    weekend = (np.asarray(start, dtype="datetime64[D]") + offsets).astype("datetime64[D]").astype(np.int64)
+    weekend = (weekend + 3) % 7 >= 5
+
+    # 평일/주말 각각의 카테고리 분포로 추첨
+    weekend_weights = weights * np.array([WEEKEND_BOOST.get(name, 1.0) for name in names])
+    codes = np.where(
+        weekend,
+        rng.choice(len(names), size=expenses, p=weekend_weights / weekend_weights.sum()),
+        rng.choice(len(names), size=expenses, p=weights / weights.sum())
+    )
+    medians = np.array([c[3] for c in CATEGORIES], dtype=float)[codes]
+    sigmas = np.array([c[4] for c in CATEGORIES], dtype=float)[codes]
+    amounts = np.round(rng.lognormal(np.log(medians), sigmas) / 100) * 100
+    return offsets, codes, np.maximum(amounts, 100)
+
+def build_user(rng, expenses, years, today=None):
+    """한 사용자의 지출/예산 행 (카테고리는 이름으로)"""
+    today = today or date.today()
+    start = date(today.year - years + 1, 1, 1)
+    days = (today - start).days + 1
+
+    offsets, codes, amounts = _expense_rows(rng, expenses, start, days)
+    expense_rows = [
+        {
+            "amount": float(amount),
+            "category": CATEGORIES[code][0],
+            "date": (start + timedelta(days=int(offset))).isoformat(),
+            "description": None,
+        }
+        for offset, code, amount in zip(offsets.tolist(), codes.tolist(), amounts.tolist())
+    ]
+
+    rent = float(round(rng.uniform(400000, 1200000), -4))
+    month = date(start.year, start.month, 1)
+    while month <= today:
+        expense_rows.append({
+            "amount": rent,
+            "category": HOUSING[0],
+            "date": (month + timedelta(days=int(rng.integers(0, 5)))).isoformat(),
+            "description": "월세",
+        })
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+    # 올해 월별 예산 (주요 카테고리) + 연간 예산 하나 - 평균 지출의 80~130%
+    monthly = expenses / (days / 30.4)
+    budget_rows = []
+    for name, _, weight, median, _ in CATEGORIES[:4]:
+        expected = monthly * weight / sum(c[2] for c in CATEGORIES) * median
+        for m in range(1, today.month + 1):
+            budget_rows.append({
+                "category": name,
+                "amount": float(round(expected * rng.uniform(0.8, 1.3), -3) or 1000),
+                "period": "monthly",
+                "year": today.year,
+                "month": m,
+            })
+    budget_rows.append({
+        "category": HOUSING[0], "amount": rent * 12, "period": "yearly", "year": today.year, "month": None
+    })
+    return expense_rows, budget_rows
+
+async def seed(db, users=10, expenses=2000, years=3, seed=42):
+    """사용자별 카테고리/지출/예산을 넣고 월간 집계를 재생성 - 반환값: 통계"""
+    from category_codes import resolve_codes
+    from rollup import rebuild
+
+    rng = np.random.default_rng(seed)
+    totals = {"users": users, "expenses": 0, "budgets": 0}
+    for index in range(users):
+        user_id = bench_user(index)
+        # 사용자마다 지출 건수도 치우치게 (0.3~2배)
+        expense_rows, budget_rows = build_user(rng, max(1, int(expenses * rng.uniform(0.3, 2.0))), years)
+
+        await db.table("categories").upsert(
+            [{"user_id": user_id, "name": name, "color": color}
+             for name, color, *_ in CATEGORIES + [HOUSING]],
+            on_conflict="user_id,name", ignore_duplicates=True
+        ).execute()
+        codes = await resolve_codes(db, user_id, [name for name, *_ in CATEGORIES + [HOUSING]])
+
+        for rows, table in ((expense_rows, "expenses"), (budget_rows, "budgets")):
+            for row in rows:
+                row["user_id"] = user_id
+                row["category_id"] = codes[row.pop("category")]
+            for start in range(0, len(rows), INSERT_CHUNK):
+                await db.table(table).insert(rows[start:start + INSERT_CHUNK]).execute()
+            totals[table] += len(rows)
+
+    totals["rollup_rows"] = await rebuild(db)
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 데이터 생성 (SQLite)")
+    parser.add_argument("--db", default="bench.db", help="SQLite 파일 경로 (기존 파일은 삭제 후 생성)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--expenses", type=int, default=2000, help="사용자당 평균 지출 건수")
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(args.db + suffix):
+            os.remove(args.db + suffix)
+
+    from sqlite_backend import SQLiteClient
+
+    async def run():
+        db = SQLiteClient(args.db)
+        try:
+            return await seed(db, args.users, args.expenses, args.years, args.seed)
+        finally:
+            await db.aclose()
+
+    started = time.perf_counter()
+    totals = asyncio.run(run())
+    print(f"✅ {args.db}: {totals} ({time.perf_counter() - started:.1f}초)")
+
+if __name__ == "__main__":
+    main()
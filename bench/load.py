@@ -0,0 +1,361 @@
+"""
+API 부하 측정
+
+datagen으로 만든 SQLite 파일의 복사본으로 서버(bench.server)를 띄우고, routers/의
+모든 엔드포인트를 동시 클라이언트로 하나씩 호출해 처리량과 p50/p95/p99 지연을 기록합니다.
+요청마다 시드된 사용자 중 하나를 골라 X-Bench-User 헤더로 보냅니다.
+
+    python -m bench.load --db bench.db --concurrency 16 --requests 200
+    python -m bench.load --url http://localhost:8000 --users 20   # 이미 실행 중인 서버
+
+결과: bench/results/load-<시각>.json (--output으로 변경)
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import os
+import platform
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Callable
+import httpx
+import numpy as np
+from bench.datagen import CATEGORIES, bench_user
+from bench.report import ROOT, git_commit, write_results
+from bench.server import USER_HEADER
+
+# 측정하지 않는 엔드포인트와 이유
+SKIPPED = {
+    "GET /api/budgets/alerts/stream": "SSE 연결은 응답이 끝나지 않으므로 지연 측정 대상이 아님",
+}
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    # ctx를 받아 요청 인자(path 치환값, params, json, content 등)를 만드는 함수
+    build: Callable[["Context"], dict] = lambda ctx: {}
+
+    @property
+    def name(self):
+        return f"{self.method} {self.path}"
+
+@dataclass
+class Context:
+    users: list
+    rng: random.Random
+    counter: itertools.count = field(default_factory=itertools.count)
+    # 쓰기 시나리오가 만든 항목 (다음 수정/삭제 시나리오가 사용): [(user, id)]
+    expenses: list = field(default_factory=list)
+    budgets: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+
+    def user(self):
+        return self.rng.choice(self.users)
+
+    def take(self, pool, remove=False):
+        if not pool:
+            return None
+        index = self.rng.randrange(len(pool))
+        return pool.pop(index) if remove else pool[index]
+
+def _random_expense(ctx):
+    day = date.today() - timedelta(days=ctx.rng.randrange(3 * 365))
+    return {
+        "amount": ctx.rng.randrange(1, 500) * 100,
+        "category": ctx.rng.choice(CATEGORIES)[0],
+        "date": day.isoformat(),
+        "description": "bench",
+    }
+
+def _period(ctx):
+    return {"year": date.today().year - ctx.rng.randrange(3), "month": ctx.rng.randrange(1, 13)}
+
+def _import_file(ctx, rows=20):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["amount", "category", "date", "description"])
+    writer.writeheader()
+    writer.writerows(_random_expense(ctx) for _ in range(rows))
+    return {"files": {"file": ("bench.csv", buffer.getvalue().encode(), "text/csv")}}
+
+def _with_item(pool, remove, build):
+    """풀에서 (사용자, id)를 골라 요청 생성 - 풀이 비었으면 None (건너뜀)"""
+    def wrapped(ctx):
+        item = ctx.take(pool(ctx), remove)
+        if item is None:
+            return None
+        user, item_id = item
+        return {"user": user, "id": item_id, **build(ctx)}
+    return wrapped
+
+def _unique_budget(ctx):
+    # 다른 요청과 (카테고리, 기간)이 겹치지 않는 새 예산
+    return {"json": {
+        "category": f"bench-budget-{next(ctx.counter)}",
+        "amount": 100000,
+        "period": "yearly",
+        "year": date.today().year,
+    }}
+
+# 실행 순서대로 (생성 → 수정 → 삭제가 같은 풀을 사용)
+SCENARIOS = [
+    Scenario("GET", "/api/expenses", lambda ctx: {"params": {"limit": 100}}),
+    Scenario("GET", "/api/expenses/export", lambda ctx: {"params": {"format": "ndjson"}}),
+    Scenario("GET", "/api/expenses/summary/category", lambda ctx: {"params": _period(ctx)}),
+    Scenario("GET", "/api/expenses/summary/monthly", lambda ctx: {"params": {"year": _period(ctx)["year"]}}),
+    Scenario("POST", "/api/expenses", lambda ctx: {"json": _random_expense(ctx)}),
+    Scenario("PUT", "/api/expenses/{expense_id}", _with_item(
+        lambda ctx: ctx.expenses, False, lambda ctx: {"json": {"amount": ctx.rng.randrange(1, 500) * 100}}
+    )),
+    Scenario("DELETE", "/api/expenses/{expense_id}", _with_item(lambda ctx: ctx.expenses, True, lambda ctx: {})),
+    Scenario("POST", "/api/expenses/batch", lambda ctx: {"json": {"operations": [
+        {"op": "create", "data": _random_expense(ctx)} for _ in range(10)
+    ]}}),
+    Scenario("POST", "/api/expenses/import", _import_file),
+    Scenario("GET", "/api/budgets", lambda ctx: {"params": {"year": date.today().year}}),
+    Scenario("GET", "/api/budgets/status", lambda ctx: {"params": _period(ctx)}),
+    Scenario("GET", "/api/budgets/alerts"),
+    Scenario("GET", "/api/budgets/alerts/events"),
+    Scenario("POST", "/api/budgets", _unique_budget),
+    Scenario("PUT", "/api/budgets", lambda ctx: {"json": {
+        "category": ctx.rng.choice(CATEGORIES)[0], "amount": ctx.rng.randrange(10, 100) * 10000,
+        "period": "monthly", "year": date.today().year, "month": ctx.rng.randrange(1, 13),
+    }}),
+    Scenario("POST", "/api/budgets/bulk", lambda ctx: {"json": {
+        "year": date.today().year, "period": "monthly", "months": list(range(1, 13)),
+        "categories": {name: ctx.rng.randrange(10, 100) * 10000 for name, *_ in CATEGORIES[:4]},
+    }}),
+    Scenario("PUT", "/api/budgets/{budget_id}", _with_item(
+        lambda ctx: ctx.budgets, False, _unique_budget
+    )),
+    Scenario("DELETE", "/api/budgets/{budget_id}", _with_item(lambda ctx: ctx.budgets, True, lambda ctx: {})),
+    Scenario("GET", "/api/categories"),
+    Scenario("GET", "/api/categories/usage", lambda ctx: {"params": _period(ctx)}),
+    Scenario("POST", "/api/categories", lambda ctx: {"json": {"name": f"bench-{next(ctx.counter)}"}}),
+    Scenario("PUT", "/api/categories/{category_id}", _with_item(
+        lambda ctx: ctx.categories, False, lambda ctx: {"json": {"name": f"bench-{next(ctx.counter)}"}}
+    )),
+    Scenario("DELETE", "/api/categories/{category_id}", _with_item(lambda ctx: ctx.categories, True, lambda ctx: {})),
+    Scenario("POST", "/api/categories/initialize"),
+    # 앞의 쓰기 시나리오가 남긴 변경 기록을 처음부터 100건씩 따라잡는 증분 동기화
+    # (since=0은 어떤 사용자의 커서보다도 앞이므로 410 없이 항상 변경분 경로를 탐)
+    Scenario("GET", "/api/sync", lambda ctx: {"params": {"since": 0, "limit": 100}}),
+    Scenario("GET", "/api/dashboard", lambda ctx: {"params": _period(ctx)}),
+    Scenario("GET", "/api/analytics/percentiles", lambda ctx: {"params": {"year": _period(ctx)["year"]}}),
+    Scenario("GET", "/api/analytics/rolling"),
+    Scenario("GET", "/api/analytics/weekday"),
+    Scenario("GET", "/api/analytics/timeseries", lambda ctx: {"params": {
+        "granularity": ctx.rng.choice(["day", "week", "month", "quarter"]), "group_by": "category"
+    }}),
+]
+
+# 생성 응답의 id를 모을 풀
+CREATED_POOLS = {
+    "POST /api/expenses": "expenses",
+    "POST /api/budgets": "budgets",
+    "POST /api/categories": "categories",
+}
+
+def summarize(latencies, statuses, errors, duration):
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (0, 0, 0)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(latencies) / duration, 1) if duration else 0,
+        "latency_ms": {
+            "mean": round(float(values.mean()), 2) if len(values) else 0,
+            "p50": round(float(p50), 2),
+            "p95": round(float(p95), 2),
+            "p99": round(float(p99), 2),
+            "max": round(float(values.max()), 2) if len(values) else 0,
+        },
+    }
+
+async def run_scenario(client, scenario, ctx, requests, concurrency, warmup):
+    """시나리오 하나를 동시 요청으로 실행 (처음 warmup건은 통계에서 제외)"""
+    latencies, statuses = [], {}
+    errors = 0
+    remaining = itertools.count()
+    pool = CREATED_POOLS.get(scenario.name)
+
+    async def one(record):
+        nonlocal errors
+        spec = scenario.build(ctx)
+        if spec is None:
+            return False
+        user = spec.pop("user", None) or ctx.user()
+        item_id = spec.pop("id", None)
+        path = scenario.path
+        if item_id is not None:
+            path = path[:path.index("{")] + str(item_id)
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(scenario.method, path, headers={USER_HEADER: user}, **spec)
+            await response.aread()
+            status = response.status_code
+        except httpx.HTTPError:
+            status = "error"
+        elapsed = time.perf_counter() - started
+
+        if pool and status == 200:
+            ctx_pool = getattr(ctx, pool)
+            ctx_pool.append((user, response.json()["data"]["id"]))
+        if record:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "error" or status >= 400:
+                errors += 1
+        return True
+
+    async def worker(record, total):
+        while next(remaining) < total:
+            if not await one(record):
+                return
+
+    await asyncio.gather(*[worker(False, warmup) for _ in range(min(concurrency, warmup))])
+    remaining = itertools.count()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(True, requests) for _ in range(concurrency)])
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def _wait_ready(url, process, timeout=60):
+    async with httpx.AsyncClient(base_url=url) as client:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError("벤치마크 서버가 시작하지 못했습니다.")
+            try:
+                if (await client.get("/health/ready")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("벤치마크 서버가 준비되지 않았습니다.")
+
+def start_server(db_path):
+    """시드 파일 복사본으로 bench.server 실행 - 반환값: (url, process, 임시 디렉터리)"""
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    copy = os.path.join(workdir, "bench.db")
+    shutil.copy(db_path, copy)
+    port = _free_port()
+    env = {**os.environ, "DB_BACKEND": "sqlite", "SQLITE_PATH": copy}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "bench.server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    return f"http://127.0.0.1:{port}", process, workdir
+
+def dataset_stats(db_path):
+    with sqlite3.connect(db_path) as conn:
+        users = [row[0] for row in conn.execute("SELECT DISTINCT user_id FROM expenses ORDER BY 1")]
+        expenses = conn.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+    return users, {"users": len(users), "expenses": expenses}
+
+def coverage(app_routes):
+    """routers/ 엔드포인트 중 시나리오가 없는 것"""
+    covered = {scenario.name for scenario in SCENARIOS} | set(SKIPPED)
+    return sorted(name for name in app_routes if name not in covered)
+
+async def run(args):
+    process = workdir = None
+    if args.url:
+        url = args.url
+        users = [bench_user(i) for i in range(args.users)]
+        dataset = {"users": len(users)}
+    else:
+        users, dataset = dataset_stats(args.db)
+        if not users:
+            raise SystemExit(f"❌ {args.db}에 데이터가 없습니다. 먼저 python -m bench.datagen을 실행하세요.")
+        url, process, workdir = start_server(args.db)
+
+    selected = [s for s in SCENARIOS if not args.only or any(word in s.name for word in args.only)]
+    ctx = Context(users=users, rng=random.Random(args.seed))
+    results = {}
+    try:
+        if process:
+            await _wait_ready(url, process)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+            for scenario in selected:
+                results[scenario.name] = await run_scenario(
+                    client, scenario, ctx, args.requests, args.concurrency, args.warmup
+                )
+                stats = results[scenario.name]
+                print(
+                    f"  {scenario.name:<38} {stats['throughput_rps']:>8.1f} req/s  "
+                    f"p50 {stats['latency_ms']['p50']:>8.2f}  p95 {stats['latency_ms']['p95']:>8.2f}  "
+                    f"p99 {stats['latency_ms']['p99']:>8.2f} ms  errors {stats['errors']}"
+                )
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "kind": "load",
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "url": args.url,
+            "db": args.db if not args.url else None,
+            "dataset": dataset,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "skipped": SKIPPED,
+        },
+        "endpoints": results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="API 엔드포인트별 처리량/지연 측정")
+    parser.add_argument("--db", default="bench.db", help="datagen으로 만든 SQLite 파일 (복사본으로 실행)")
+    parser.add_argument("--url", help="이미 실행 중인 bench.server 주소 (지정 시 --db 무시)")
+    parser.add_argument("--users", type=int, default=10, help="--url 사용 시 시드된 사용자 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="엔드포인트별 측정 요청 수")
+    parser.add_argument("--warmup", type=int, default=10, help="엔드포인트별 측정 전 요청 수")
+    parser.add_argument("--only", nargs="*", help="이름에 이 문자열이 들어간 시나리오만 실행")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본값: bench/results/load-<시각>.json)")
+    args = parser.parse_args()
+
+    from main import app
+    routes = [
+        f"{method} {route.path}" for route in app.routes
+        if route.path.startswith("/api/") for method in getattr(route, "methods", ())
+    ]
+    missing = coverage(routes)
+    if missing:
+        print(f"⚠️ 시나리오가 없는 엔드포인트: {', '.join(missing)}")
+
+    print(f"🚀 동시 {args.concurrency} × 엔드포인트별 {args.requests}건")
+    data = asyncio.run(run(args))
+    print(f"✅ 결과 저장: {write_results(data, args.output, 'load')}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+핵심 연산 마이크로 벤치마크 (서버 없이 함수 단위)
+
+datagen과 같은 분포의 지출로 분석 엔진, 집계 변화량 계산, 응답 직렬화, 캐시, SQLite 쿼리를
+반복 실행해 최소/중앙값/평균 시간을 기록합니다.
+
+    python -m bench.micro --expenses 200000 --repeat 20
+
+결과: bench/results/micro-<시각>.json (--output으로 변경)
+"""
+
+import argparse
+import asyncio
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+import numpy as np
+from bench.datagen import CATEGORIES, HOUSING, build_user
+from bench.report import git_commit, write_results
+
+def measure(func, repeat):
+    """func를 repeat번 실행한 시간 통계 (ms)"""
+    func()  # 첫 실행(지연 import, 캐시 준비)은 제외
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+    }
+
+def analytics_benchmarks(rows, names):
+    from analytics import ExpenseFrame, to_day_numbers
+    from rollup import collect_deltas
+
+    frame = ExpenseFrame.from_expenses(rows, names)
+    today = date.today()
+    start, end = to_day_numbers([f"{today.year - 1}-01-01", today.isoformat()]).tolist()
+    rollups = [
+        {"year": year, "month": month, "category_id": category_id, "total_amount": amount, "count": count}
+        for (year, month, category_id), (amount, count) in collect_deltas(rows).items()
+    ]
+    return {
+        "frame.from_expenses": lambda: ExpenseFrame.from_expenses(rows, names),
+        "frame.from_rollups": lambda: ExpenseFrame.from_rollups(rollups, names),
+        "frame.slice_period": lambda: frame.slice_period(today.year, today.month),
+        "frame.totals_by_category": frame.totals_by_category,
+        "frame.totals_by_month": frame.totals_by_month,
+        "frame.time_buckets.day": lambda: frame.time_buckets(start, end, "day"),
+        "frame.time_buckets.month_by_category": lambda: frame.time_buckets(start, end, "month", True),
+        "frame.category_percentiles": frame.category_percentiles,
+        "frame.rolling_daily": lambda: frame.rolling_daily(end - 89, end),
+        "frame.by_weekday": frame.by_weekday,
+        "rollup.collect_deltas": lambda: collect_deltas(rows),
+    }
+
+def serialization_benchmarks(rows, names):
+    """지출 1000행 페이지 응답 인코딩: 이전(List[dict] + JSONResponse) / 이후(응답 모델 + fields=)"""
+    import uuid
+    from typing import List
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+    from models import ExpenseResponse
+    from serialization import parse_fields, project, typed_list_response
+
+    now = datetime.now().astimezone().isoformat()
+    page = [
+        {"id": str(uuid.uuid4()), "user_id": "bench-user", "amount": row["amount"],
+         "category_id": row["category_id"], "category": names[row["category_id"]], "date": row["date"],
+         "description": None, "created_at": now, "updated_at": now}
+        for row in rows[:1000]
+    ]
+    field = create_response_field("Response_get_expenses", List[dict])
+    loop = asyncio.new_event_loop()
+
+    async def before():
+        # 이전 경로: FastAPI가 List[dict]로 검증/변환 후 표준 json으로 인코딩
+        return JSONResponse(await serialize_response(field=field, response_content=page)).body
+
+    fields = parse_fields("id,amount,category,date", ExpenseResponse)
+    return {
+        "serialize.page1000 before (List[dict] + json)": lambda: loop.run_until_complete(before()),
+        "serialize.page1000 after (ExpenseResponse)": lambda: typed_list_response(ExpenseResponse, page).body,
+        "serialize.page1000 after (fields=id,amount,category,date)":
+            lambda: typed_list_response(ExpenseResponse, project(page, fields)).body,
+    }
+
+def cache_benchmarks():
+    from cache import TTLCache
+
+    cache = TTLCache(maxsize=1024, ttl=60)
+    loop = asyncio.new_event_loop()
+
+    async def loader():
+        return [1, 2, 3]
+
+    async def hits():
+        for i in range(1000):
+            await cache.get_or_load("bench", "user", (i % 100,), loader)
+
+    return {"cache.get_or_load x1000": lambda: loop.run_until_complete(hits())}
+
+def sqlite_benchmarks(rows, names, workdir):
+    from sqlite_backend import SQLiteClient
+    from category_codes import resolve_codes
+
+    db = SQLiteClient(os.path.join(workdir, "micro.db"))
+    loop = asyncio.new_event_loop()
+    user_id = "micro-user"
+    codes = loop.run_until_complete(resolve_codes(db, user_id, [c[0] for c in CATEGORIES + [HOUSING]]))
+    table_rows = [
+        {"user_id": user_id, "amount": row["amount"], "category_id": codes[names[row["category_id"]]],
+         "date": row["date"], "description": None}
+        for row in rows
+    ]
+    for start in range(0, len(table_rows), 5000):
+        loop.run_until_complete(db.table("expenses").insert(table_rows[start:start + 5000]).execute())
+    loop.run_until_complete(db.rpc("rebuild_expense_rollups", {"p_user_id": user_id}).execute())
+    year = date.today().year
+
+    def run(query):
+        return lambda: loop.run_until_complete(query().execute())
+
+    benchmarks = {
+        "sqlite.insert x1000": run(lambda: db.table("expenses").insert(table_rows[:1000])),
+        "sqlite.select page(100)": run(lambda: db.table("expenses").select("*").eq("user_id", user_id)
+                                       .order("date", desc=True).order("id", desc=True).limit(100)),
+        "sqlite.rpc category_expense_summary": run(lambda: db.rpc("category_expense_summary", {
+            "p_user_id": user_id, "p_year": year, "p_month": None})),
+        "sqlite.rollups year": run(lambda: db.table("expense_rollups").select("*")
+                                   .eq("user_id", user_id).eq("year", year)),
+    }
+    return benchmarks, lambda: loop.run_until_complete(db.aclose())
+
+def main():
+    parser = argparse.ArgumentParser(description="분석/집계/캐시/SQLite 마이크로 벤치마크")
+    parser.add_argument("--expenses", type=int, default=100000)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="이름에 이 문자열이 들어간 항목만 실행")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본값: bench/results/micro-<시각>.json)")
+    args = parser.parse_args()
+
+    expense_rows, _ = build_user(np.random.default_rng(args.seed), args.expenses, args.years)
+    names = {code: name for code, (name, *_) in enumerate(CATEGORIES + [HOUSING], start=1)}
+    codes = {name: code for code, name in names.items()}
+    rows = [
+        {"date": row["date"], "amount": row["amount"], "category_id": codes[row["category"]]}
+        for row in expense_rows
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="bench-micro-")
+    sqlite, close = sqlite_benchmarks(rows, names, workdir)
+    benchmarks = {
+        **analytics_benchmarks(rows, names), **serialization_benchmarks(rows, names), **cache_benchmarks(), **sqlite
+    }
+
+    results = {}
+    print(f"🔬 지출 {len(rows)}건, 반복 {args.repeat}회")
+    try:
+        for name, func in benchmarks.items():
+            if args.only and not any(word in name for word in args.only):
+                continue
+            results[name] = measure(func, args.repeat)
+            print(f"  {name:<60} min {results[name]['min_ms']:>10.3f}  median {results[name]['median_ms']:>10.3f} ms")
+    finally:
+        close()
+
+    data = {
+        "meta": {
+            "kind": "micro",
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "expenses": len(rows),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "benchmarks": results,
+    }
+    print(f"✅ 결과 저장: {write_results(data, args.output, 'micro')}")
+
+if __name__ == "__main__":
+    main()
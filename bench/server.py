@@ -0,0 +1,20 @@
+"""
+부하 측정용 서버 앱
+
+main.app과 같지만 사용자 ID를 X-Bench-User 헤더에서 읽어 여러 사용자의
+데이터로 요청을 보낼 수 있습니다 (헤더가 없으면 원래 사용자).
+
+    DB_BACKEND=sqlite SQLITE_PATH=bench.db uvicorn bench.server:app
+"""
+
+from fastapi import Header
+from main import app
+from routers import analytics, budgets, categories, dashboard, expenses, sync
+
+USER_HEADER = "X-Bench-User"
+
+def _user_from_header(x_bench_user: str = Header("test-user")):
+    return x_bench_user
+
+for module in (analytics, budgets, categories, dashboard, expenses, sync):
+    app.dependency_overrides[module.get_current_user_id] = _user_from_header
@@ -0,0 +1,92 @@
+"""
+프로세스 내 읽기 캐시 (TTL + LRU)
+
+키는 (namespace, user_id, params) 형태이며, 쓰기 핸들러가
+invalidate(namespace, user_id)로 해당 사용자의 항목만 정확히 무효화합니다.
+캐시된 값은 여러 요청이 공유하므로 호출하는 쪽에서 수정하면 안 됩니다.
+"""
+
+import os
+import time
+from collections import OrderedDict
+
+CACHE_TTL = float(os.getenv("CACHE_TTL", "60"))
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", "1024"))
+
+class TTLCache:
+    def __init__(self, maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (만료 시각, 값)
+        self._groups = {}              # (namespace, user_id) -> 키 집합
+        self._generations = {}         # (namespace, user_id) -> 무효화 횟수
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """(찾음 여부, 값) 반환"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry[1]
+
+    def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        self._groups.setdefault(key[:2], set()).add(key)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        group = self._groups.get(key[:2])
+        if group is not None:
+            group.discard(key)
+            if not group:
+                del self._groups[key[:2]]
+
+    def invalidate(self, namespace, user_id):
+        """사용자의 해당 namespace 항목 전체 무효화"""
+        group = (namespace, user_id)
+        self._generations[group] = self._generations.get(group, 0) + 1
+        for key in list(self._groups.pop(group, ())):
+            self._entries.pop(key, None)
+        self.invalidations += 1
+
+    async def get_or_load(self, namespace, user_id, params, loader):
+        """캐시에 없으면 loader()를 실행해 저장 후 반환"""
+        key = (namespace, user_id, params)
+        found, value = self.get(key)
+        if found:
+            return value
+        generation = self._generations.get(key[:2], 0)
+        value = await loader()
+        # 조회 중에 무효화되었다면 오래된 값이므로 저장하지 않음
+        if self._generations.get(key[:2], 0) == generation:
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# 전역 캐시 인스턴스
+cache = TTLCache()
@@ -0,0 +1,50 @@
+"""
+백엔드 기능 감지 (처음 한 번 확인 후 캐시)
+
+Supabase 프로젝트마다 sql/functions.sql 설치 여부가 다르므로, 요청마다
+없을 수도 있는 테이블/함수를 호출했다가 실패하는 대신 시작할 때 한 번
+확인해 두고 요약 API가 사용할 집계 경로를 고릅니다.
+"""
+
+import asyncio
+from database import is_transient_error
+
+# 기능 이름 -> 존재 여부를 확인하는 가벼운 조회
+PROBES = {
+    "expense_rollups": lambda db: db.table("expense_rollups").select("user_id").limit(1).execute(),
+    "category_expense_summary": lambda db: db.rpc("category_expense_summary", {"p_user_id": ""}).execute(),
+    "monthly_expense_summary": lambda db: db.rpc("monthly_expense_summary", {"p_user_id": ""}).execute(),
+}
+
+_capabilities = None
+_lock = asyncio.Lock()
+
+async def _probe(db, probe):
+    try:
+        await probe(db)
+        return True
+    except Exception as e:
+        # 네트워크 문제는 기능이 없다는 뜻이 아니므로 판단 보류
+        return None if is_transient_error(e) else False
+
+def detected_capabilities():
+    """감지가 끝난 결과 (아직이면 None)"""
+    return _capabilities
+
+async def get_capabilities(db):
+    """{기능 이름: 사용 가능 여부} - 판단이 끝난 결과만 캐시"""
+    global _capabilities
+    if _capabilities is not None:
+        return _capabilities
+
+    async with _lock:
+        if _capabilities is not None:
+            return _capabilities
+        results = await asyncio.gather(*[_probe(db, probe) for probe in PROBES.values()])
+        detected = dict(zip(PROBES, results))
+        if None in results:
+            print(f"⚠️ 백엔드 기능 감지 보류 (연결 실패): {detected}")
+            return {name: bool(available) for name, available in detected.items()}
+        _capabilities = detected
+        print(f"🔎 백엔드 기능: {', '.join(f'{k}={v}' for k, v in detected.items())}")
+        return _capabilities
@@ -0,0 +1,70 @@
+"""
+카테고리 이름 <-> 정수 코드 사전
+
+지출/예산/집계 테이블은 카테고리를 정수 코드(categories.code)로 저장하고,
+API는 지금처럼 카테고리 이름을 주고받습니다. 이름 변경은 categories 행 하나만
+바꾸면 되고, 필터와 그룹 집계는 인덱스가 있는 정수 열로 처리됩니다.
+카테고리별 지출/예산 참조 수(expense_count, budget_count)는 DB 트리거가 유지합니다.
+
+이전 버전은 지출/예산의 카테고리를 자유 문자열로 저장했으므로 등록되지 않은 이름도
+받았습니다. 그 동작을 유지하기 위해 처음 쓰인 이름은 기본 색상의 카테고리로 만들고,
+그 카테고리는 카테고리 목록에도 나타납니다 (오타도 새 카테고리가 됨).
+"""
+
+from cache import cache
+
+# 지출/예산에서 처음 쓰인 이름으로 카테고리를 만들 때의 색상
+DEFAULT_COLOR = "#6B7280"
+
+# 카테고리 목록/동기화 응답 열 (참조 수는 지출/예산 쓰기마다 바뀌므로 제외)
+CATEGORY_COLUMNS = "id, code, user_id, name, color, created_at, updated_at"
+
+async def load_categories(db, user_id):
+    """사용자 카테고리 목록 (이름순, 캐시 사용 - 반환값을 수정하지 말 것)"""
+    async def loader():
+        result = await db.table("categories")\
+            .select(CATEGORY_COLUMNS)\
+            .eq("user_id", user_id)\
+            .order("name")\
+            .execute()
+        return result.data
+    return await cache.get_or_load("categories", user_id, (), loader)
+
+class CategoryDictionary:
+    def __init__(self, categories):
+        self.by_name = {category["name"]: category["code"] for category in categories}
+        self.by_code = {category["code"]: category["name"] for category in categories}
+
+    def name(self, code):
+        return self.by_code.get(code)
+
+    def code(self, name):
+        return self.by_name.get(name)
+
+async def load_dictionary(db, user_id):
+    """카테고리 사전 (카테고리 목록과 함께 무효화됨)"""
+    async def loader():
+        return CategoryDictionary(await load_categories(db, user_id))
+    return await cache.get_or_load("categories", user_id, ("dictionary",), loader)
+
+async def resolve_codes(db, user_id, names):
+    """이름 목록의 코드 {이름: 코드} - 없는 카테고리는 기본 색상으로 만듦"""
+    dictionary = await load_dictionary(db, user_id)
+    missing = [name for name in dict.fromkeys(names) if name not in dictionary.by_name]
+    if missing:
+        # 동시에 같은 이름을 만들어도 (user_id, name) 고유 키로 하나만 남음
+        await db.table("categories")\
+            .upsert(
+                [{"user_id": user_id, "name": name, "color": DEFAULT_COLOR} for name in missing],
+                on_conflict="user_id,name",
+                ignore_duplicates=True
+            )\
+            .execute()
+        cache.invalidate("categories", user_id)
+        dictionary = await load_dictionary(db, user_id)
+    return {name: dictionary.by_name[name] for name in names}
+
+async def with_names(db, user_id, rows):
+    """DB 행의 category_id에 카테고리 이름(category)을 붙인 새 목록"""
+    dictionary = await load_dictionary(db, user_id)
+    return [{**row, "category": dictionary.name(row.get("category_id"))} for row in rows]
@@ -0,0 +1,46 @@
+"""
+사용자별 변경 기록(change_log)과 증분 동기화 커서
+
+지출/예산/카테고리 테이블의 DB 트리거가 행이 생성/수정/삭제될 때마다 같은
+트랜잭션에서 바뀐 행의 id를 change_log에 기록합니다(데이터만 쓰이고 기록이
+빠지는 일이 없음). 각 기록에는 증가하는 번호(seq)가 붙고, 클라이언트는
+마지막으로 받은 번호(커서) 이후의 기록만 GET /api/sync?since=<커서>로 받아
+바뀐 행은 다시 조회하고, 없어진 행은 삭제 표시(tombstone)로 반영합니다.
+"""
+
+ENTITIES = ("expenses", "budgets", "categories")
+
+async def head(db, user_id):
+    """사용자의 마지막 변경 번호 (기록이 없으면 0)"""
+    result = await db.table("change_log")\
+        .select("seq")\
+        .eq("user_id", user_id)\
+        .order("seq", desc=True)\
+        .limit(1)\
+        .execute()
+    return result.data[0]["seq"] if result.data else 0
+
+async def changes_since(db, user_id, since, limit):
+    """since 이후의 변경 기록 (번호순 최대 limit개) - 반환값: (entries, has_more)"""
+    result = await db.table("change_log")\
+        .select("seq, entity, entity_id, op")\
+        .eq("user_id", user_id)\
+        .gt("seq", since)\
+        .order("seq")\
+        .limit(limit + 1)\
+        .execute()
+    return result.data[:limit], len(result.data) > limit
+
+def collapse(entries):
+    """(entity, id)마다 마지막 작업만 남김 - 반환값: {entity: (upserted ids, deleted ids)}"""
+    latest = {}
+    for entry in entries:
+        key = (entry["entity"], entry["entity_id"])
+        latest.pop(key, None)
+        latest[key] = entry["op"]
+    collapsed = {entity: ([], []) for entity in ENTITIES}
+    for (entity, entity_id), op in latest.items():
+        if entity in collapsed:
+            upserted, deleted = collapsed[entity]
+            (deleted if op == "delete" else upserted).append(entity_id)
+    return collapsed
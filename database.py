@@ -1,28 +1,79 @@
+import asyncio
 import os
-from supabase import create_client, Client
+import sqlite3
+import sys
+import time
 from dotenv import load_dotenv
+from metrics import InstrumentedClient
 
 # .env 파일 로드
 load_dotenv()
 
-# 환경변수 확인
+# 저장소 백엔드 선택 (supabase | sqlite)
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "expense_tracker.db")
+
+if DB_BACKEND not in ("supabase", "sqlite"):
+    raise ValueError(f"❌ 지원하지 않는 DB_BACKEND입니다: {DB_BACKEND}")
+
+# 환경변수 확인 (클라이언트는 처음 사용할 때 생성 - import만으로는 네트워크 클라이언트를 만들지 않음)
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_KEY")
 
-print(f"🔍 SUPABASE_URL: {supabase_url}")
-print(f"🔍 SUPABASE_KEY: {'설정됨' if supabase_key else '설정되지 않음'}")
+def _check_supabase_settings():
+    print(f"🔍 SUPABASE_URL: {supabase_url}")
+    print(f"🔍 SUPABASE_KEY: {'설정됨' if supabase_key else '설정되지 않음'}")
+
+    if not supabase_url:
+        raise ValueError("❌ SUPABASE_URL이 설정되지 않았습니다.")
+    if not supabase_key:
+        raise ValueError("❌ SUPABASE_KEY가 설정되지 않았습니다.")
+
+_async_client = None
+
+def get_async_client():
+    """비동기 클라이언트 반환 (DB_BACKEND에 따라 Supabase 연결 풀 또는 내장 SQLite)
+
+    모든 table()/rpc() 호출의 시간과 반환 행 수가 metrics에 기록됩니다.
+    """
+    global _async_client
+    if _async_client is None and DB_BACKEND == "sqlite":
+        from sqlite_backend import SQLiteClient
+        print(f"🔍 SQLite 저장소 사용: {SQLITE_PATH}")
+        _async_client = InstrumentedClient(SQLiteClient(SQLITE_PATH))
+    elif _async_client is None:
+        from postgrest_backend import create_client
+        _check_supabase_settings()
+        _async_client = InstrumentedClient(create_client(supabase_url, supabase_key))
+    return _async_client
+
+def is_client_created():
+    return _async_client is not None
+
+async def close_async_client():
+    """연결 풀 정리 (서버 종료 시 호출)"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
 
-if not supabase_url:
-    raise ValueError("❌ SUPABASE_URL이 설정되지 않았습니다.")
-if not supabase_key:
-    raise ValueError("❌ SUPABASE_KEY가 설정되지 않았습니다.")
+async def ping():
+    """백엔드 왕복 한 번 (가장 가벼운 조회) - 반환값: 지연 시간(ms)"""
+    db = get_async_client()
+    started = time.perf_counter()
+    await db.table("categories").select("id").limit(1).execute()
+    return round((time.perf_counter() - started) * 1000, 2)
 
-try:
-    supabase: Client = create_client(supabase_url, supabase_key)
-    print("✅ Supabase 클라이언트 생성 성공")
-except Exception as e:
-    print(f"❌ Supabase 클라이언트 생성 실패: {e}")
-    raise
+def is_unique_violation(error):
+    """고유 키 위반 오류인지 확인 (PostgreSQL 23505 / SQLite IntegrityError)"""
+    return getattr(error, "code", None) == "23505" or (
+        isinstance(error, sqlite3.IntegrityError) and "UNIQUE" in str(error)
+    )
 
-def get_supabase_client():
-    return supabase
+def is_transient_error(error):
+    """연결 실패/타임아웃처럼 다시 시도하면 성공할 수 있는 오류인지 확인"""
+    if isinstance(error, (asyncio.TimeoutError, OSError)):
+        return True
+    # httpx는 Supabase 백엔드를 사용할 때만 import되어 있음
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, httpx.TransportError)
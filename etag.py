@@ -0,0 +1,51 @@
+"""
+사용자별 데이터 버전과 ETag 처리
+
+모든 쓰기 핸들러가 bump_version(user_id)을 호출하고, 조회 API는 그 버전으로
+강한 ETag를 만듭니다. 버전은 집계 같은 파생 쓰기까지 끝난 뒤 올리므로
+쓰는 도중에 만든 응답은 이전 버전의 ETag를 받고, 쓰기가 끝나면 무효가 됩니다. If-None-Match가 현재 ETag와 같으면
+데이터베이스를 조회하지 않고 304 Not Modified로 응답합니다.
+"""
+
+import hashlib
+import uuid
+from datetime import date
+from fastapi import Depends, HTTPException, Request, Response
+
+# 서버 재시작 후 이전 ETag가 우연히 일치하지 않도록 부팅마다 다른 값 사용
+BOOT_ID = uuid.uuid4().hex[:8]
+
+_versions = {}
+
+def get_version(user_id):
+    return _versions.get(user_id, 0)
+
+def bump_version(user_id):
+    """사용자 데이터가 바뀌었음을 기록 (모든 쓰기 핸들러에서 파생 쓰기까지 끝난 뒤 호출)"""
+    _versions[user_id] = _versions.get(user_id, 0) + 1
+
+def compute_etag(user_id, request, today=None):
+    """데이터 버전 + 경로/쿼리(+ 기준 날짜)로 만든 강한 ETag"""
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    key = f"{user_id}|{request.url.path}?{query}"
+    if today is not None:
+        key += f"|{today.isoformat()}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return f'"{BOOT_ID}-{get_version(user_id)}-{digest}"'
+
+def _matches(if_none_match, etag):
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def etag_guard(get_user_id, by_date=False):
+    """라우트 dependencies에 넣어 사용하는 ETag 검사 의존성 생성
+
+    by_date: 기간 기본값이 오늘/이번 달인 조회용 - 날짜가 바뀌면 쓰기가 없어도 ETag가 바뀜
+    """
+    async def check(request: Request, response: Response, user_id: str = Depends(get_user_id)):
+        etag = compute_etag(user_id, request, date.today() if by_date else None)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _matches(if_none_match, etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    return check
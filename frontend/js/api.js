@@ -5,25 +5,41 @@ class API {
         this.headers = {
             'Content-Type': 'application/json'
         };
+        // GET 응답 캐시 (url -> { etag, data }) - 304 응답 시 재사용
+        this.etagCache = new Map();
     }
 
     // 기본 fetch 래퍼
     async request(endpoint, options = {}) {
         const url = `${this.baseURL}${endpoint}`;
+        const isGet = !options.method || options.method === 'GET';
+        const cached = isGet ? this.etagCache.get(url) : null;
         const config = {
-            headers: this.headers,
+            headers: cached ? { ...this.headers, 'If-None-Match': cached.etag } : this.headers,
             ...options
         };
 
         try {
             const response = await fetch(url, config);
             
+            // 변경 없음: 이전에 받은 데이터 재사용
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
+
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({}));
-                throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+                const error = new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+                error.status = response.status;
+                throw error;
             }
 
-            return await response.json();
+            const data = await response.json();
+            const etag = response.headers.get('ETag');
+            if (isGet && etag) {
+                this.etagCache.set(url, { etag, data });
+            }
+            return data;
         } catch (error) {
             console.error('API request failed:', error);
             throw error;
@@ -72,6 +88,9 @@ class API {
         // 지출 삭제
         delete: (id) => this.delete(`/expenses/${id}`),
         
+        // 지출 일괄 생성/수정/삭제 (operations: [{op, id, data}], 전부 적용되거나 전부 취소)
+        batch: (operations) => this.post('/expenses/batch', { operations }),
+        
         // 카테고리별 요약
         getCategorySummary: (params = {}) => this.get('/expenses/summary/category', params),
         
@@ -87,6 +106,12 @@ class API {
         // 예산 추가
         create: (data) => this.post('/budgets', data),
         
+        // 예산 설정 또는 변경 (같은 기간이 있으면 교체)
+        upsert: (data) => this.put('/budgets', data),
+        
+        // 예산 계획 일괄 설정 ({year, period, categories: {카테고리: 금액 또는 월별 금액 목록}, months})
+        setPlan: (plan) => this.post('/budgets/bulk', plan),
+        
         // 예산 수정
         update: (id, data) => this.put(`/budgets/${id}`, data),
         
@@ -97,7 +122,14 @@ class API {
         getStatus: (params = {}) => this.get('/budgets/status', params),
         
         // 예산 알림
-        getAlerts: (params = {}) => this.get('/budgets/alerts', params)
+        getAlerts: (params = {}) => this.get('/budgets/alerts', params),
+        
+        // 예산 임계값 이벤트 실시간 구독 (SSE, 끊기면 브라우저가 자동 재접속)
+        subscribeAlerts: (onAlert) => {
+            const source = new EventSource(`${this.baseURL}/budgets/alerts/stream`);
+            source.addEventListener('budget_alert', (e) => onAlert(JSON.parse(e.data)));
+            return source;
+        }
     };
 
     // 카테고리 관련 API
@@ -120,7 +152,116 @@ class API {
         // 기본 카테고리 초기화
         initialize: () => this.post('/categories/initialize', {})
     };
+
+    // 대시보드 API
+    dashboard = {
+        // 대시보드 데이터 한 번에 조회
+        get: (params = {}) => this.get('/dashboard', params)
+    };
+
+    // 증분 동기화 API
+    sync = {
+        // since 이후 변경분 (since가 없으면 현재 커서만)
+        get: (since = null, params = {}) => this.get('/sync', since === null ? params : { ...params, since })
+    };
+}
+
+// 증분 동기화 저장소
+// 처음 한 번 목록 API로 전체를 받은 뒤에는 /sync로 바뀐 행과 삭제된 id만 받아 반영
+class SyncStore {
+    constructor(api) {
+        this.api = api;
+        this.cursor = null;
+        this.expenses = new Map();
+        this.budgets = new Map();
+        this.categories = new Map();
+        this.pending = null;
+    }
+
+    // 최신 상태로 맞춤 (동시에 호출되면 앞의 동기화가 끝난 뒤 차례로 실행)
+    sync() {
+        const previous = this.pending || Promise.resolve();
+        this.pending = previous.catch(() => {}).then(() => this.pull());
+        return this.pending;
+    }
+
+    async pull() {
+        if (this.cursor === null) {
+            return this.load();
+        }
+
+        let delta;
+        do {
+            try {
+                delta = await this.api.sync.get(this.cursor);
+            } catch (error) {
+                // 커서가 만료됨 (서버 데이터 초기화 등): 전체 다시 로드
+                if (error.status === 410) {
+                    return this.load();
+                }
+                throw error;
+            }
+            this.apply(delta);
+            this.cursor = delta.cursor;
+        } while (delta.has_more);
+    }
+
+    // 전체 로드 - 커서를 먼저 받아 두므로 목록 조회 중의 변경은 다음 동기화에서 다시 반영됨
+    async load() {
+        const { cursor } = await this.api.sync.get();
+        const [categories, expenses, budgets] = await Promise.all([
+            this.api.categories.getAll(),
+            this.api.expenses.getAll({ limit: 100 }),
+            this.api.budgets.getAll()
+        ]);
+
+        this.categories = new Map(categories.map(category => [category.id, category]));
+        this.expenses = new Map(expenses.map(expense => [expense.id, expense]));
+        this.budgets = new Map(budgets.map(budget => [budget.id, budget]));
+        this.cursor = cursor;
+    }
+
+    // 변경분 반영 (바뀐 행은 교체, 삭제된 id는 제거)
+    apply(delta) {
+        for (const entity of ['categories', 'expenses', 'budgets']) {
+            for (const row of delta.changes[entity]) {
+                this[entity].set(row.id, row);
+            }
+            for (const id of delta.deleted[entity]) {
+                this[entity].delete(id);
+            }
+        }
+
+        // 지출/예산은 카테고리 이름을 붙여 받으므로 이름이 바뀐 카테고리를 반영
+        for (const category of delta.changes.categories) {
+            for (const rows of [this.expenses, this.budgets]) {
+                for (const row of rows.values()) {
+                    if (row.category_id === category.code) {
+                        row.category = category.name;
+                    }
+                }
+            }
+        }
+    }
+
+    // 카테고리 목록 (이름순)
+    categoryList() {
+        return [...this.categories.values()].sort((a, b) => a.name.localeCompare(b.name));
+    }
+
+    // 지출 목록 (최신 날짜순, 같은 날짜는 id 역순)
+    expenseList(limit = 100) {
+        return [...this.expenses.values()]
+            .sort((a, b) => b.date.localeCompare(a.date) || (b.id > a.id) - (b.id < a.id))
+            .slice(0, limit);
+    }
+
+    // 예산 목록 (최근 생성순)
+    budgetList() {
+        return [...this.budgets.values()].sort((a, b) => b.created_at.localeCompare(a.created_at));
+    }
 }
 
-// 전역 API 인스턴스
+// 전역 API 인스턴스와 동기화 저장소
 window.api = new API();
+window.store = new SyncStore(window.api);
@@ -19,6 +19,15 @@ class ExpenseTracker {
         this.setupFormDefaults();
         await this.loadInitialData();
         this.updateDashboard();
+        this.subscribeBudgetAlerts();
+    }
+
+    // 예산 임계값 알림 구독 (폴링 대신 서버에서 푸시)
+    subscribeBudgetAlerts() {
+        if (!window.EventSource) return;
+        this.alertSource = api.budgets.subscribeAlerts((alert) => {
+            Components.showToast(alert.message, alert.type === 'over_budget' ? 'error' : 'warning');
+        });
     }
 
     // 이벤트 리스너 설정
@@ -80,16 +89,12 @@ class ExpenseTracker {
         try {
             Components.showLoading();
             
-            // 병렬로 데이터 로드
-            const [categories, expenses, budgets] = await Promise.all([
-                api.categories.getAll(),
-                api.expenses.getAll({ limit: 100 }),
-                api.budgets.getAll()
-            ]);
+            // 목록 전체 로드 (이후에는 변경분만 동기화)
+            await store.sync();
 
-            this.categories = categories;
-            this.expenses = expenses;
-            this.budgets = budgets;
+            this.categories = store.categoryList();
+            this.expenses = store.expenseList();
+            this.budgets = store.budgetList();
 
             this.updateCategorySelects();
             
@@ -140,44 +145,33 @@ class ExpenseTracker {
     async updateDashboard() {
         try {
             const currentDate = Utils.getCurrentDate();
-            const monthRange = Utils.getCurrentMonthRange();
-
-            // 이번 달 지출 조회
-            const monthlyExpenses = await api.expenses.getAll({
-                start_date: monthRange.start,
-                end_date: monthRange.end
-            });
+            const period = document.getElementById('chart-period').value;
 
-            // 이번 달 예산 조회
-            const monthlyBudgets = await api.budgets.getAll({
-                period: 'monthly',
+            // 합계, 예산 진행률, 차트, 최근 지출을 한 번에 조회
+            const dashboard = await api.dashboard.get({
                 year: currentDate.year,
-                month: currentDate.month
+                month: currentDate.month,
+                category_period: period
             });
-
-            // 요약 데이터 계산
-            const totalExpense = monthlyExpenses.reduce((sum, exp) => sum + exp.amount, 0);
-            const totalBudget = monthlyBudgets.reduce((sum, budget) => sum + budget.amount, 0);
-            const remainingBudget = totalBudget - totalExpense;
+            const { month_expense, month_budget, remaining_budget, budget_usage_percentage } = dashboard.totals;
 
             // UI 업데이트
-            document.getElementById('monthly-expense').textContent = Utils.formatCurrency(totalExpense);
-            document.getElementById('monthly-budget').textContent = Utils.formatCurrency(totalBudget);
-            document.getElementById('remaining-budget').textContent = Utils.formatCurrency(remainingBudget);
+            document.getElementById('monthly-expense').textContent = Utils.formatCurrency(month_expense);
+            document.getElementById('monthly-budget').textContent = Utils.formatCurrency(month_budget);
+            document.getElementById('remaining-budget').textContent = Utils.formatCurrency(remaining_budget);
 
             // 예산 진행률
-            const budgetProgress = totalBudget > 0 ? (totalExpense / totalBudget) * 100 : 0;
-            document.getElementById('budget-progress').style.width = `${Math.min(budgetProgress, 100)}%`;
+            document.getElementById('budget-progress').style.width = `${Math.min(budget_usage_percentage, 100)}%`;
 
             // 남은 일수
             const daysLeft = Utils.getDaysLeftInMonth();
             document.getElementById('days-left').textContent = `이번 달 ${daysLeft}일 남음`;
 
             // 차트 업데이트
-            await this.updateCharts();
+            await this.updateCharts(dashboard);
 
             // 최근 지출 업데이트
-            this.updateRecentExpenses();
+            this.updateRecentExpenses(dashboard.recent_expenses);
 
         } catch (error) {
             console.error('Failed to update dashboard:', error);
@@ -185,28 +179,30 @@ class ExpenseTracker {
         }
     }
 
-    // 차트 업데이트
-    async updateCharts() {
+    // 차트 업데이트 (대시보드 응답이 있으면 추가 요청 없이 사용)
+    async updateCharts(dashboard = null) {
         await Promise.all([
-            this.updateCategoryChart(),
-            this.updateMonthlyChart()
+            this.updateCategoryChart(dashboard ? dashboard.category_breakdown : null),
+            this.updateMonthlyChart(dashboard ? dashboard.monthly_trend : null)
         ]);
     }
 
     // 카테고리별 차트 업데이트
-    async updateCategoryChart() {
+    async updateCategoryChart(categoryData = null) {
         try {
-            const period = document.getElementById('chart-period').value;
-            const currentDate = Utils.getCurrentDate();
-            
-            let params = {};
-            if (period === 'month') {
-                params = { year: currentDate.year, month: currentDate.month };
-            } else {
-                params = { year: currentDate.year };
-            }
+            if (!categoryData) {
+                const period = document.getElementById('chart-period').value;
+                const currentDate = Utils.getCurrentDate();
+                
+                let params = {};
+                if (period === 'month') {
+                    params = { year: currentDate.year, month: currentDate.month };
+                } else {
+                    params = { year: currentDate.year };
+                }
 
-            const categoryData = await api.expenses.getCategorySummary(params);
+                categoryData = await api.expenses.getCategorySummary(params);
+            }
 
             const ctx = document.getElementById('categoryChart').getContext('2d');
             
@@ -233,10 +229,12 @@ class ExpenseTracker {
     }
 
     // 월별 차트 업데이트
-    async updateMonthlyChart() {
+    async updateMonthlyChart(monthlyData = null) {
         try {
-            const currentDate = Utils.getCurrentDate();
-            const monthlyData = await api.expenses.getMonthlySummary({ year: currentDate.year });
+            if (!monthlyData) {
+                const currentDate = Utils.getCurrentDate();
+                monthlyData = await api.expenses.getMonthlySummary({ year: currentDate.year });
+            }
 
             const ctx = document.getElementById('monthlyChart').getContext('2d');
             
@@ -263,8 +261,7 @@ class ExpenseTracker {
     }
 
     // 최근 지출 업데이트
-    updateRecentExpenses() {
-        const recentExpenses = this.expenses.slice(0, 5);
+    updateRecentExpenses(recentExpenses = this.expenses.slice(0, 5)) {
         const container = document.getElementById('recent-expenses-list');
 
         if (recentExpenses.length === 0) {
@@ -287,7 +284,9 @@ class ExpenseTracker {
         try {
             Components.showLoading();
             
-            const expenses = await api.expenses.getAll({ limit: 100 });
+            // 마지막 동기화 이후 바뀐 지출만 받아 반영
+            await store.sync();
+            const expenses = store.expenseList();
             this.expenses = expenses;
 
             const container = document.getElementById('expenses-list');
@@ -321,11 +320,13 @@ class ExpenseTracker {
 
             const currentDate = Utils.getCurrentDate();
             
-            // 예산 현황과 목록을 병렬로 로드
-            const [budgetStatus, budgets] = await Promise.all([
+            // 예산 현황 조회와 목록 동기화를 병렬로
+            const [budgetStatus] = await Promise.all([
                 api.budgets.getStatus({ year: currentDate.year, month: currentDate.month }),
-                api.budgets.getAll()
+                store.sync()
             ]);
+            const budgets = store.budgetList();
+            this.budgets = budgets;
 
             // 예산 현황 표시
             const statusContainer = document.getElementById('budget-status');
@@ -403,7 +404,8 @@ class ExpenseTracker {
         try {
             Components.showLoading();
 
-            const categories = await api.categories.getAll();
+            await store.sync();
+            const categories = store.categoryList();
             this.categories = categories;
 
             const container = document.getElementById('categories-list');
@@ -605,8 +607,8 @@ class ExpenseTracker {
                 await api.budgets.update(this.editingBudget, formData);
                 Components.showToast('예산이 수정되었습니다.');
             } else {
-                // 추가
-                await api.budgets.create(formData);
+                // 추가 (같은 기간의 예산이 있으면 금액 교체)
+                await api.budgets.upsert(formData);
                 Components.showToast('예산이 설정되었습니다.');
             }
 
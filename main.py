@@ -1,11 +1,53 @@
-from fastapi import FastAPI
+import startup  # 다른 모듈보다 먼저 import해 시작 시각 기록
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from routers import expenses_router, budgets_router, categories_router
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from routers import expenses_router, budgets_router, categories_router, dashboard_router, analytics_router, sync_router
+from database import DB_BACKEND, get_async_client, close_async_client, is_client_created, ping
+from capabilities import get_capabilities, detected_capabilities
+from cache import cache
+import metrics
+import profiling
+
+startup.mark("imports")
+
+# 준비 상태 확인 시 백엔드 왕복 제한 시간(초)
+HEALTH_TIMEOUT = float(os.getenv("HEALTH_TIMEOUT", "2"))
+
+async def warm_up():
+    """백엔드 클라이언트 생성과 기능 감지 (서버는 기다리지 않고 바로 요청을 받음)"""
+    try:
+        with startup.phase("backend_client"):
+            db = get_async_client()
+        # 요약 API가 사용할 집계 경로를 미리 결정
+        with startup.phase("capabilities"):
+            await get_capabilities(db)
+        if detected_capabilities() is None:
+            raise ConnectionError("백엔드에 연결할 수 없어 기능 감지를 보류했습니다.")
+        startup.mark_ready()
+    except Exception as e:
+        # 초기화 실패는 /health/ready로 확인 (각 요청은 필요할 때 다시 시도)
+        startup.mark_failed(e)
+        print(f"❌ 백엔드 초기화 실패: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_task = asyncio.create_task(warm_up())
+    yield
+    warm_up_task.cancel()
+    # 종료 시 공유 연결 풀 정리
+    await close_async_client()
 
 app = FastAPI(
     title="가계부 API",
     description="Supabase 기반 가계부 관리 시스템",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # 표준 json 모듈보다 빠른 orjson으로 응답 인코딩
+    default_response_class=ORJSONResponse
 )
 
 # 307 리다이렉트 방지
@@ -18,12 +60,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id", "Server-Timing"],
 )
 
+# 라우트/상태 코드별 응답 시간 기록 (/metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# X-Profile 헤더가 붙은 요청 프로파일링 (PROFILING_ENABLED일 때만)
+if profiling.PROFILING_ENABLED:
+    app.add_middleware(profiling.ProfilingMiddleware)
+
 # 라우터 등록
 app.include_router(expenses_router, prefix="/api")
 app.include_router(budgets_router, prefix="/api")
 app.include_router(categories_router, prefix="/api")
+app.include_router(dashboard_router, prefix="/api")
+app.include_router(analytics_router, prefix="/api")
+app.include_router(sync_router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -37,6 +90,63 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+async def liveness_check():
+    """프로세스 생존 확인 (백엔드 조회 없음)"""
+    return {"status": "alive", "uptime_s": startup.report()["uptime_s"]}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """요청 처리 준비 상태 (초기화 완료 + 백엔드 왕복 성공), 준비 전이면 503"""
+    backend = {"type": DB_BACKEND, "latency_ms": None, "error": None}
+    try:
+        backend["latency_ms"] = await asyncio.wait_for(ping(), HEALTH_TIMEOUT)
+    except asyncio.TimeoutError:
+        backend["error"] = f"{HEALTH_TIMEOUT:g}초 안에 응답이 없습니다."
+    except Exception as e:
+        backend["error"] = str(e) or type(e).__name__
+    
+    if backend["error"] is None and not startup.is_ready():
+        # 시작할 때 연결 실패로 끝나지 않은 초기화를 다시 시도
+        await warm_up()
+    
+    ready = startup.is_ready() and backend["error"] is None
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            "backend": backend,
+            "warm_up": {
+                "client": is_client_created(),
+                "capabilities": detected_capabilities(),
+            },
+            "startup": startup.report()
+        }
+    )
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """읽기 캐시 적중/미스 통계"""
+    return cache.stats()
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """요청/백엔드 호출 지표 (Prometheus 텍스트 형식)"""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/profiles")
+async def list_profiles():
+    """최근 프로파일링 결과 목록 (최신순)"""
+    return profiling.list_profiles()
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """프로파일링 결과 (호출 트리 + 단계별 시간)"""
+    result = profiling.get_profile(profile_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="프로파일링 결과를 찾을 수 없습니다.")
+    return result
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
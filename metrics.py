@@ -0,0 +1,212 @@
+"""
+요청/백엔드 호출 지표 (Prometheus 텍스트 형식)
+
+외부 라이브러리나 수집 서버 없이 프로세스 안에서 히스토그램/카운터를 모으고
+/metrics에서 Prometheus 텍스트 형식으로 내보냅니다.
+
+- http_request_duration_seconds{method, route, status}: 라우트(경로 템플릿)별 응답 시간
+- db_query_duration_seconds{table, op}: 백엔드 호출 시간 (op: select/insert/upsert/update/delete/rpc, rpc는 table에 함수 이름)
+- db_query_rows_total{table, op}: 백엔드 호출이 반환한 행 수
+- db_query_errors_total{table, op}: 실패한 백엔드 호출 수
+- singleflight_requests_total{handler, role}: 동시 조회 합치기 (singleflight)
+"""
+
+import time
+from bisect import bisect_left
+import profiling
+
+# 응답 시간 버킷(초) - Prometheus 클라이언트 기본값
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+INF = 'le="+Inf"'
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # 레이블 값 튜플 -> 누적값
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+class Gauge(Counter):
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # 레이블 값 튜플 -> [버킷별 개수..., 합계, 전체 개수]
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        # 누적 개수는 내보낼 때 계산 (관측마다 버킷 하나만 증가)
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[index] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, INF)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]!r}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP 요청 처리 시간(초)", ("method", "route", "status")
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "처리 중인 HTTP 요청 수")
+DB_DURATION = Histogram("db_query_duration_seconds", "백엔드 호출 시간(초)", ("table", "op"))
+DB_ROWS = Counter("db_query_rows_total", "백엔드 호출이 반환한 행 수", ("table", "op"))
+DB_ERRORS = Counter("db_query_errors_total", "실패한 백엔드 호출 수", ("table", "op"))
+
+SINGLEFLIGHT = Counter(
+    "singleflight_requests_total",
+    "조회 요청 수 (leader: 직접 계산, follower: 처리 중인 같은 요청에 합류)",
+    ("handler", "role")
+)
+
+REGISTRY = [REQUEST_DURATION, REQUESTS_IN_PROGRESS, DB_DURATION, DB_ROWS, DB_ERRORS, SINGLEFLIGHT]
+
+def render():
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """라우트/상태 코드별 응답 시간 기록 (ASGI 미들웨어)
+
+    레이블에는 실제 경로 대신 라우트의 경로 템플릿(/api/expenses/{expense_id})을 사용하고,
+    어떤 라우트에도 맞지 않는 요청은 "unmatched"로 묶어 레이블 수가 늘어나지 않게 합니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            # 라우터가 매칭한 라우트를 같은 scope에 기록해 둠
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"], getattr(route, "path_format", "unmatched"), str(status)
+            )
+
+# 쿼리 빌더에서 작업 종류를 정하는 메서드 (그 밖의 필터/정렬 메서드는 작업을 바꾸지 않음)
+OPERATIONS = {"select", "insert", "upsert", "update", "delete"}
+
+def _row_count(data):
+    if isinstance(data, list):
+        return len(data)
+    return 0 if data is None else 1
+
+class _TimedQuery:
+    """쿼리 빌더를 감싸 execute()의 시간/반환 행 수를 기록"""
+
+    __slots__ = ("_builder", "_table", "_op")
+
+    def __init__(self, builder, table, op):
+        self._builder = builder
+        self._table = table
+        self._op = op
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+        op = name if name in OPERATIONS else self._op
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # 체인 메서드가 돌려준 빌더도 계속 감쌈
+            return _TimedQuery(result, self._table, op) if hasattr(result, "execute") else result
+        return call
+
+    async def execute(self):
+        started = time.perf_counter()
+        try:
+            response = await self._builder.execute()
+        except Exception:
+            DB_ERRORS.inc(self._table, self._op)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_DURATION.observe(elapsed, self._table, self._op)
+            profiling.add_backend_call(self._table, self._op, elapsed)
+        DB_ROWS.inc(self._table, self._op, amount=_row_count(response.data))
+        return response
+
+class InstrumentedClient:
+    """table()/rpc() 호출을 기록하는 백엔드 클라이언트 래퍼 (그 밖의 속성은 그대로 전달)"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, table):
+        return _TimedQuery(self._client.table(table), table, "select")
+
+    def from_(self, table):
+        return self.table(table)
+
+    def rpc(self, func, params):
+        return _TimedQuery(self._client.rpc(func, params), func, "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import date as DateType  # 이름 충돌 방지
-from typing import Optional
+from typing import Dict, List, Optional, Union
 
 # 지출 모델
 class ExpenseCreate(BaseModel):
@@ -15,10 +15,20 @@ class ExpenseUpdate(BaseModel):
     date: Optional[DateType] = None  # DateType 사용
     description: Optional[str] = None
 
+class ExpenseBatchOperation(BaseModel):
+    op: str = Field(..., pattern="^(create|update|delete)$")
+    id: Optional[str] = None      # update/delete 대상
+    data: Optional[dict] = None   # create는 ExpenseCreate, update는 ExpenseUpdate 형식
+
+class ExpenseBatchRequest(BaseModel):
+    operations: List[ExpenseBatchOperation] = Field(..., min_length=1, max_length=1000)
+
+# 조회 응답 모델 (fields=로 일부 필드만 요청하면 그 필드만 검증해 응답)
 class ExpenseResponse(BaseModel):
     id: str
     user_id: str
     amount: float
+    category_id: int
     category: str
     date: DateType  # DateType 사용
     description: Optional[str]
@@ -33,9 +43,17 @@ class BudgetCreate(BaseModel):
     year: int = Field(..., ge=2020, le=2030)
     month: Optional[int] = Field(None, ge=1, le=12)
 
+class BudgetPlan(BaseModel):
+    year: int = Field(..., ge=2020, le=2030)
+    period: str = Field("monthly", pattern="^(monthly|yearly)$")
+    # 카테고리 -> 금액 (월별 예산은 months와 같은 길이의 월별 금액 목록도 가능)
+    categories: Dict[str, Union[float, List[float]]] = Field(..., min_length=1)
+    months: List[int] = Field(default_factory=lambda: list(range(1, 13)))
+
 class BudgetResponse(BaseModel):
     id: str
     user_id: str
+    category_id: int
     category: str
     amount: float
     period: str
@@ -51,6 +69,7 @@ class CategoryCreate(BaseModel):
 
 class CategoryResponse(BaseModel):
     id: str
+    code: int
     user_id: str
     name: str
     color: str
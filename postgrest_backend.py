@@ -0,0 +1,58 @@
+"""
+Supabase(PostgREST) 저장소 백엔드
+
+httpx/postgrest는 import 비용이 크므로 database.get_async_client()가
+Supabase 백엔드를 처음 사용할 때만 이 모듈을 불러옵니다.
+"""
+
+import os
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.base_request_builder import BaseSelectRequestBuilder
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS, DEFAULT_POSTGREST_CLIENT_TIMEOUT
+
+# 비동기 클라이언트 연결 풀 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_KEEPALIVE_CONNECTIONS = int(os.getenv("DB_KEEPALIVE_CONNECTIONS", str(DB_POOL_SIZE)))
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "30"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", str(DEFAULT_POSTGREST_CLIENT_TIMEOUT)))
+
+def _chained_order(self, column, *, desc=False, nullsfirst=False, foreign_table=None):
+    """order()를 여러 번 호출하면 정렬 조건을 하나의 order 파라미터에 이어 붙임
+
+    postgrest 0.13은 order 파라미터를 중복으로 추가하는데,
+    PostgREST는 그중 하나만 사용하므로 (date, id) 같은 복합 정렬이 동작하지 않습니다.
+    """
+    key = f"{foreign_table}.order" if foreign_table else "order"
+    term = f"{column}{'.desc' if desc else ''}{'.nullsfirst' if nullsfirst else ''}"
+    existing = self.params.get(key)
+    self.params = self.params.set(key, f"{existing},{term}" if existing else term)
+    return self
+
+BaseSelectRequestBuilder.order = _chained_order
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    """모든 요청이 하나의 keep-alive 연결 풀을 공유하는 비동기 PostgREST 클라이언트"""
+
+    def create_session(self, base_url, headers, timeout):
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=DB_POOL_SIZE,
+                max_keepalive_connections=DB_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+def create_client(url, key):
+    return PooledPostgrestClient(
+        f"{url}/rest/v1",
+        headers={
+            **DEFAULT_POSTGREST_CLIENT_HEADERS,
+            "apiKey": key,
+            "Authorization": f"Bearer {key}",
+        },
+        timeout=DB_TIMEOUT,
+    )
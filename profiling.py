@@ -0,0 +1,255 @@
+"""
+요청 단위 프로파일링 (옵트인)
+
+PROFILING_ENABLED=true로 실행한 서버에서 요청에 "X-Profile: 1" 헤더를 붙이면
+그 요청만 프로파일링합니다.
+
+- 샘플링 호출 트리: 별도 스레드가 PROFILE_INTERVAL(ms)마다 이벤트 루프 스레드의 스택을
+  읽되, 루프가 이 요청의 태스크를 실행 중일 때의 샘플만 모읍니다.
+- 단계별 시간: backend_io는 백엔드 호출(metrics의 execute)을 기다린 실제 시간이고,
+  validation/aggregation/serialization/other는 샘플의 스택을 안쪽부터 살펴 분류한 추정치입니다.
+
+응답에는 X-Profile-Id와 Server-Timing(단계별 ms) 헤더가 붙고, 전체 결과는
+GET /profiles/{id}로 조회합니다 (최근 PROFILE_HISTORY개 보관).
+헤더가 없는 요청이나 PROFILING_ENABLED가 꺼진 서버는 추가 작업이 없습니다.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "1"))
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "20"))
+
+PROFILE_HEADER = b"x-profile"
+
+# 샘플 분류 규칙: 스택을 안쪽 프레임부터 보며 처음 맞는 모듈의 단계로 분류
+# (json/asyncio처럼 규칙에 없는 모듈은 건너뛰고 호출한 쪽으로 판단)
+PHASE_MODULES = (
+    ("backend_io", ("sqlite_backend", "sqlite3", "postgrest", "httpx", "httpcore")),
+    ("validation", ("pydantic", "pydantic_core", "fastapi.dependencies", "fastapi._compat", "models")),
+    ("serialization", ("fastapi.encoders", "fastapi.responses", "starlette.responses", "orjson", "serialization")),
+    ("aggregation", ("analytics", "rollup", "alerts", "category_codes", "cache", "etag", "routers", "numpy")),
+)
+# 이 모듈 아래에서 잡힌 샘플은 안쪽 프레임과 관계없이 그 단계로 분류
+# (serialization의 응답 행 검증은 pydantic을 거치지만 응답을 만드는 시간이므로 serialization)
+PHASE_OWNERS = (
+    ("serialization", ("serialization",)),
+)
+PHASES = ("backend_io", "validation", "aggregation", "serialization", "other")
+
+_current = ContextVar("profile", default=None)
+_profiles = OrderedDict()  # id -> 결과
+_module_phases = {}        # 모듈 이름 -> 단계 ("" = 규칙 없음)
+_module_owners = {}        # 모듈 이름 -> PHASE_OWNERS의 단계 ("" = 규칙 없음)
+_sampling = {"active": 0, "switch_interval": None}
+
+def _match(module, rules, memo):
+    phase = memo.get(module)
+    if phase is None:
+        phase = ""
+        for name, prefixes in rules:
+            if any(module == p or module.startswith(p + ".") for p in prefixes):
+                phase = name
+                break
+        memo[module] = phase
+    return phase
+
+def _phase_of(module):
+    return _match(module, PHASE_MODULES, _module_phases)
+
+def _owner_of(module):
+    return _match(module, PHASE_OWNERS, _module_owners)
+
+class Profile:
+    def __init__(self, scope):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.started = time.perf_counter()
+        self.backend_calls = {}     # (table, op) -> [횟수, 초]
+        self.sampled = dict.fromkeys(PHASES, 0.0)
+        self.tree = {}              # 프레임 이름 -> [샘플 수, 하위 트리]
+        self.samples = 0
+        self.off_task = 0.0
+
+    def add_backend_call(self, table, op, elapsed):
+        call = self.backend_calls.setdefault((table, op), [0, 0.0])
+        call[0] += 1
+        call[1] += elapsed
+
+    def add_sample(self, frame, weight, root_code):
+        stack = []
+        while frame is not None and frame.f_code is not root_code:
+            stack.append(frame)
+            frame = frame.f_back
+        # 샘플 시간을 가장 안쪽에서 처음 맞는 단계에 더함 (바깥에 PHASE_OWNERS 모듈이 있으면 그 단계)
+        phase = "other"
+        for f in stack:
+            module = f.f_globals.get("__name__", "")
+            owner = _owner_of(module)
+            if owner:
+                phase = owner
+                break
+            if phase == "other":
+                phase = _phase_of(module) or "other"
+        self.sampled[phase] += weight
+        self.samples += 1
+
+        node = self.tree
+        for f in reversed(stack):
+            code = f.f_code
+            name = f"{code.co_name} ({f.f_globals.get('__name__', '?')}:{code.co_firstlineno})"
+            entry = node.get(name)
+            if entry is None:
+                entry = node[name] = [0, {}]
+            entry[0] += 1
+            node = entry[1]
+
+    def phases_ms(self):
+        phases = {phase: round(seconds * 1000, 2) for phase, seconds in self.sampled.items()}
+        # 백엔드 호출은 샘플 추정 대신 실제로 기다린 시간
+        phases["backend_io"] = round(sum(s for _, s in self.backend_calls.values()) * 1000, 2)
+        return phases
+
+    def server_timing(self):
+        total = round((time.perf_counter() - self.started) * 1000, 2)
+        parts = [f"{phase};dur={ms}" for phase, ms in self.phases_ms().items()]
+        return ", ".join(parts + [f"total;dur={total}"])
+
+    def result(self, status, route):
+        def tree(node):
+            return [
+                {"frame": name, "samples": count, "children": tree(children)}
+                for name, (count, children) in sorted(node.items(), key=lambda item: -item[1][0])
+            ]
+
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": route,
+            "status": status,
+            "started_at": self.started_at,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "phases_ms": self.phases_ms(),
+            "backend_calls": [
+                {"table": table, "op": op, "count": count, "ms": round(seconds * 1000, 2)}
+                for (table, op), (count, seconds) in self.backend_calls.items()
+            ],
+            "sampling": {
+                "interval_ms": PROFILE_INTERVAL,
+                "samples": self.samples,
+                "off_task_ms": round(self.off_task * 1000, 2),
+            },
+            "call_tree": tree(self.tree),
+        }
+
+class _Sampler(threading.Thread):
+    """이벤트 루프 스레드의 스택을 주기적으로 읽어 Profile에 기록"""
+
+    def __init__(self, profile, root_code):
+        super().__init__(name=f"profile-{profile.id}", daemon=True)
+        self.profile = profile
+        self.root_code = root_code
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+
+    def start(self):
+        # 루프 스레드가 GIL을 오래 잡고 있으면 샘플이 거의 안 잡히므로
+        # 프로파일링 중에는 스레드 전환 간격을 샘플 간격에 맞춤 (마지막 프로파일이 끝나면 복원)
+        if _sampling["active"] == 0:
+            _sampling["switch_interval"] = sys.getswitchinterval()
+            sys.setswitchinterval(min(_sampling["switch_interval"], PROFILE_INTERVAL / 1000))
+        _sampling["active"] += 1
+        super().start()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        _sampling["active"] -= 1
+        if _sampling["active"] == 0:
+            sys.setswitchinterval(_sampling["switch_interval"])
+
+    def run(self):
+        interval = PROFILE_INTERVAL / 1000
+        current_tasks = asyncio.tasks._current_tasks
+        last = time.perf_counter()
+        while not self.stopped.wait(interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            # 다른 요청을 처리하거나 I/O를 기다리는 동안의 샘플은 제외
+            if current_tasks.get(self.loop) is not self.task:
+                self.profile.off_task += weight
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.profile.add_sample(frame, weight, self.root_code)
+
+def add_backend_call(table, op, elapsed):
+    """백엔드 호출 시간 기록 (프로파일링 중인 요청에서만)"""
+    profile = _current.get()
+    if profile is not None:
+        profile.add_backend_call(table, op, elapsed)
+
+def get_profile(profile_id):
+    return _profiles.get(profile_id)
+
+def list_profiles():
+    return [
+        {key: result[key] for key in ("id", "method", "path", "status", "started_at", "total_ms")}
+        for result in reversed(_profiles.values())
+    ]
+
+def _store(result):
+    _profiles[result["id"]] = result
+    while len(_profiles) > PROFILE_HISTORY:
+        _profiles.popitem(last=False)
+
+class ProfilingMiddleware:
+    """X-Profile 헤더가 있는 요청만 프로파일링 (ASGI 미들웨어, PROFILING_ENABLED일 때만 등록)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(
+            name == PROFILE_HEADER and value not in (b"", b"0") for name, value in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(scope)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile.id.encode()),
+                    (b"server-timing", profile.server_timing().encode()),
+                ]
+            await send(message)
+
+        token = _current.set(profile)
+        sampler = _Sampler(profile, ProfilingMiddleware.__call__.__code__)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            _current.reset(token)
+            route = scope.get("route")
+            _store(profile.result(status, getattr(route, "path_format", None)))
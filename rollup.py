@@ -0,0 +1,91 @@
+"""
+사용자별 월간 카테고리 지출 집계(expense_rollups) 관리
+
+(user_id, year, month, category_id)마다 합계와 건수를 유지하므로
+요약 API는 지출 원본 대신 카테고리 × 월 개수만큼의 행만 읽으면 됩니다.
+
+기존 데이터 재집계:
+    python -m rollup rebuild [user_id]
+"""
+
+import asyncio
+import sys
+
+def rollup_key(expense):
+    """지출 행에서 집계 키 (year, month, category_id) 추출"""
+    return int(expense["date"][:4]), int(expense["date"][5:7]), expense["category_id"]
+
+def collect_deltas(expenses, sign=1, deltas=None):
+    """지출 목록을 집계 키별 (금액, 건수) 변화량으로 합산"""
+    deltas = {} if deltas is None else deltas
+    for expense in expenses:
+        key = rollup_key(expense)
+        amount, count = deltas.get(key, (0, 0))
+        deltas[key] = (amount + sign * float(expense["amount"]), count + sign)
+    return deltas
+
+async def apply_deltas(db, user_id, deltas):
+    """변화량을 expense_rollups에 반영 (키마다 원자적 증감 한 번)
+    
+    반환값: {집계 키: (반영 전 합계, 반영 후 합계)} - 예산 임계값 판단에 사용
+    """
+    keys = [key for key, (amount, count) in deltas.items() if amount or count]
+    calls = [
+        db.rpc("bump_expense_rollup", {
+            "p_user_id": user_id,
+            "p_year": year,
+            "p_month": month,
+            "p_category_id": category_id,
+            "p_amount": deltas[(year, month, category_id)][0],
+            "p_count": deltas[(year, month, category_id)][1],
+        }).execute()
+        for year, month, category_id in keys
+    ]
+    results = await asyncio.gather(*calls)
+    changes = {}
+    for key, result in zip(keys, results):
+        after = float(result.data[0]["total_amount"]) if result.data else 0.0
+        changes[key] = (after - deltas[key][0], after)
+    return changes
+
+async def apply_expense_change(db, user_id, old=None, new=None):
+    """지출 생성(new)/수정(old, new)/삭제(old)를 집계에 반영"""
+    deltas = collect_deltas([old] if old else [], sign=-1)
+    collect_deltas([new] if new else [], sign=1, deltas=deltas)
+    try:
+        return await apply_deltas(db, user_id, deltas)
+    except Exception as e:
+        # 지출 자체는 저장되었으므로 요청은 실패시키지 않음 (rebuild로 복구 가능)
+        print(f"Rollup update error: {e}")
+        return {}
+
+async def fetch_rollups(db, user_id, year=None, month=None, columns="*", category_id=None):
+    """기간(및 카테고리) 조건에 맞는 집계 행 조회"""
+    query = db.table("expense_rollups").select(columns).eq("user_id", user_id)
+    if year:
+        query = query.eq("year", year)
+    if month:
+        query = query.eq("month", month)
+    if category_id:
+        query = query.eq("category_id", category_id)
+    return (await query.execute()).data
+
+async def rebuild(db, user_id=None):
+    """지출 원본으로부터 집계 테이블 재생성"""
+    return (await db.rpc("rebuild_expense_rollups", {"p_user_id": user_id}).execute()).data
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("사용법: python -m rollup rebuild [user_id]")
+        sys.exit(1)
+
+    from database import get_async_client, close_async_client
+
+    async def _main():
+        try:
+            count = await rebuild(get_async_client(), sys.argv[2] if len(sys.argv) > 2 else None)
+            print(f"✅ 집계 재생성 완료: {count}개 행")
+        finally:
+            await close_async_client()
+
+    asyncio.run(_main())
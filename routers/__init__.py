@@ -5,5 +5,8 @@ API 라우터 패키지
 from .expenses import router as expenses_router
 from .budgets import router as budgets_router
 from .categories import router as categories_router
+from .dashboard import router as dashboard_router
+from .analytics import router as analytics_router
+from .sync import router as sync_router
 
-__all__ = ["expenses_router", "budgets_router", "categories_router"]
+__all__ = ["expenses_router", "budgets_router", "categories_router", "dashboard_router", "analytics_router", "sync_router"]
@@ -0,0 +1,149 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from datetime import date, timedelta
+import asyncio
+from database import get_async_client
+from etag import etag_guard
+from singleflight import coalesced
+from analytics import ExpenseFrame, GRANULARITIES, load_expense_frame, to_day_numbers, bucket_numbers
+from capabilities import get_capabilities
+from rollup import fetch_rollups
+from category_codes import load_dictionary
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# 한 번에 조회할 수 있는 최대 일수 (이동 평균)
+MAX_ROLLING_DAYS = 3660
+
+# 시계열 조회의 최대 구간 수
+MAX_BUCKETS = 3660
+
+# 임시 사용자 ID (실제로는 JWT 토큰에서 추출)
+def get_current_user_id():
+    return "test-user"
+
+# 조회 API용 ETag 검사 (데이터 버전이 같으면 304)
+check_etag = etag_guard(get_current_user_id)
+# 종료일 기본값이 오늘인 조회용 (날짜가 바뀌면 새로 계산)
+check_dated_etag = etag_guard(get_current_user_id, by_date=True)
+
+def _parse_numbers(value, name, low, high):
+    """'25,50,90' 형식의 쉼표 구분 숫자 목록 파싱"""
+    try:
+        numbers = [float(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} 형식이 올바르지 않습니다.")
+    if not numbers or any(not low <= n <= high for n in numbers):
+        raise HTTPException(status_code=400, detail=f"{name}는 {low:g}~{high:g} 사이여야 합니다.")
+    return numbers
+
+@router.get("/percentiles", dependencies=[Depends(check_etag)])
+@coalesced
+async def get_category_percentiles(
+    user_id: str = Depends(get_current_user_id),
+    year: Optional[int] = Query(None),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    percentiles: str = Query("25,50,75,90", description="쉼표로 구분한 백분위수 (0~100)")
+):
+    """카테고리별 지출 금액 분포 (백분위수)"""
+    supabase = get_async_client()
+    qs = _parse_numbers(percentiles, "percentiles", 0, 100)
+    
+    try:
+        frame = (await load_expense_frame(supabase, user_id)).slice_period(year, month)
+        return frame.category_percentiles(qs)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/rolling", dependencies=[Depends(check_dated_etag)])
+@coalesced
+async def get_rolling_averages(
+    user_id: str = Depends(get_current_user_id),
+    start_date: Optional[date] = Query(None, description="시작일 (기본값: 종료일 90일 전)"),
+    end_date: Optional[date] = Query(None, description="종료일 (기본값: 오늘)"),
+    windows: str = Query("7,30", description="쉼표로 구분한 이동 평균 기간(일)")
+):
+    """일별 지출 합계와 이동 평균"""
+    supabase = get_async_client()
+    window_days = sorted({int(w) for w in _parse_numbers(windows, "windows", 1, 365)})
+    
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=89)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="시작일이 종료일보다 늦습니다.")
+    if (end_date - start_date).days >= MAX_ROLLING_DAYS:
+        raise HTTPException(status_code=400, detail=f"조회 기간은 최대 {MAX_ROLLING_DAYS}일입니다.")
+    
+    try:
+        frame = await load_expense_frame(supabase, user_id)
+        start, end = to_day_numbers([start_date.isoformat(), end_date.isoformat()]).tolist()
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "windows": window_days,
+            "days": frame.rolling_daily(start, end, window_days)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/weekday", dependencies=[Depends(check_etag)])
+@coalesced
+async def get_weekday_breakdown(
+    user_id: str = Depends(get_current_user_id),
+    year: Optional[int] = Query(None),
+    month: Optional[int] = Query(None, ge=1, le=12)
+):
+    """요일별 지출 통계"""
+    supabase = get_async_client()
+    
+    try:
+        frame = (await load_expense_frame(supabase, user_id)).slice_period(year, month)
+        return frame.by_weekday()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/timeseries", dependencies=[Depends(check_dated_etag)])
+@coalesced
+async def get_timeseries(
+    user_id: str = Depends(get_current_user_id),
+    start_date: Optional[date] = Query(None, description="시작일 (기본값: 종료일 1년 전)"),
+    end_date: Optional[date] = Query(None, description="종료일 (기본값: 오늘)"),
+    granularity: str = Query("month", pattern="^(day|week|month|quarter|year)$", description="기간 단위"),
+    group_by: Optional[str] = Query(None, pattern="^category$", description="category 지정 시 카테고리별로 나눔")
+):
+    """기간 단위별 지출 합계 (빈 구간 포함, 차트용)"""
+    supabase = get_async_client()
+    
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=364)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="시작일이 종료일보다 늦습니다.")
+    
+    start, end = to_day_numbers([start_date.isoformat(), end_date.isoformat()]).tolist()
+    first, last = bucket_numbers([start, end], granularity).tolist()
+    if last - first + 1 > MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"구간 수는 최대 {MAX_BUCKETS}개입니다.")
+    
+    try:
+        # 월 경계에 맞춘 월/분기/연 단위는 지출 원본 대신 월간 집계 행으로 계산
+        month_aligned = start_date.day == 1 and (end_date + timedelta(days=1)).day == 1
+        capabilities = await get_capabilities(supabase)
+        if granularity in GRANULARITIES[2:] and month_aligned and capabilities["expense_rollups"]:
+            year = start_date.year if start_date.year == end_date.year else None
+            rollups, dictionary = await asyncio.gather(
+                fetch_rollups(supabase, user_id, year, columns="year, month, category_id, total_amount, count"),
+                load_dictionary(supabase, user_id)
+            )
+            frame = ExpenseFrame.from_rollups(rollups, dictionary.by_code)
+        else:
+            frame = await load_expense_frame(supabase, user_id)
+        
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "granularity": granularity,
+            "group_by": group_by,
+            "buckets": frame.time_buckets(start, end, granularity, by_category=group_by == "category")
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
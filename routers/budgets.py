@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-import calendar
-from models import BudgetCreate, BudgetResponse
-from database import get_supabase_client
+from datetime import datetime
+import asyncio
+from models import BudgetCreate, BudgetResponse, BudgetPlan
+from database import get_async_client, is_unique_violation
+from analytics import load_period_frame
+from category_codes import load_dictionary, resolve_codes, with_names
+from cache import cache
+from etag import etag_guard, bump_version
+from singleflight import coalesced
+from alerts import hub, format_sse, load_period_budgets, SSE_HEARTBEAT
+from serialization import parse_fields, select_columns, project, typed_list_response
 
 router = APIRouter(prefix="/budgets", tags=["budgets"])
 
@@ -10,77 +19,171 @@ router = APIRouter(prefix="/budgets", tags=["budgets"])
 def get_current_user_id():
     return "test-user"
 
-@router.post("", response_model=dict)
-async def create_budget(
-    budget: BudgetCreate,
-    user_id: str = Depends(get_current_user_id)
-):
-    """예산 설정"""
-    supabase = get_supabase_client()
-    
-    data = {
+# 조회 API용 ETag 검사 (데이터 버전이 같으면 304)
+check_etag = etag_guard(get_current_user_id)
+
+# 예산 고유 키 (user_id, category_id, period, year, month) - upsert 충돌 대상
+BUDGET_KEY = "user_id,category_id,period,year,month"
+
+def _budget_row(user_id, budget, category_id):
+    return {
         "user_id": user_id,
-        "category": budget.category,
+        "category_id": category_id,
         "amount": budget.amount,
         "period": budget.period,
         "year": budget.year,
         "month": budget.month if budget.period == "monthly" else None
     }
+
+def _budgets_changed(user_id):
+    cache.invalidate("budgets", user_id)
+    bump_version(user_id)
+
+@router.post("", response_model=dict)
+async def create_budget(
+    budget: BudgetCreate,
+    user_id: str = Depends(get_current_user_id)
+):
+    """예산 설정 (같은 기간에 이미 있으면 400)"""
+    supabase = get_async_client()
     
     try:
-        # 기존 예산이 있는지 확인
-        existing = supabase.table("budgets")\
-            .select("id")\
-            .eq("user_id", user_id)\
-            .eq("category", budget.category)\
-            .eq("period", budget.period)\
-            .eq("year", budget.year)
-        
-        if budget.period == "monthly" and budget.month:
-            existing = existing.eq("month", budget.month)
-        
-        existing_result = existing.execute()
+        codes = await resolve_codes(supabase, user_id, [budget.category])
         
-        if existing_result.data:
+        # 중복 여부는 고유 키가 판단하므로 조회 없이 바로 삽입
+        result = await supabase.table("budgets")\
+            .insert(_budget_row(user_id, budget, codes[budget.category]))\
+            .execute()
+        _budgets_changed(user_id)
+        return {"message": "예산이 설정되었습니다.", "data": (await with_names(supabase, user_id, result.data))[0]}
+    except Exception as e:
+        if is_unique_violation(e):
             raise HTTPException(
                 status_code=400, 
                 detail="해당 기간에 이미 예산이 설정되어 있습니다."
             )
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("", response_model=dict)
+async def upsert_budget(
+    budget: BudgetCreate,
+    user_id: str = Depends(get_current_user_id)
+):
+    """예산 설정 또는 변경 (같은 기간의 예산이 있으면 금액 교체, 한 번의 요청)"""
+    supabase = get_async_client()
+    
+    try:
+        codes = await resolve_codes(supabase, user_id, [budget.category])
+        result = await supabase.table("budgets")\
+            .upsert(_budget_row(user_id, budget, codes[budget.category]), on_conflict=BUDGET_KEY)\
+            .execute()
+        _budgets_changed(user_id)
+        return {"message": "예산이 저장되었습니다.", "data": (await with_names(supabase, user_id, result.data))[0]}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/bulk", response_model=dict)
+async def set_budget_plan(
+    plan: BudgetPlan,
+    user_id: str = Depends(get_current_user_id)
+):
+    """예산 계획 일괄 설정 (카테고리 × 월 전체를 한 번의 upsert로 저장)"""
+    supabase = get_async_client()
+    
+    if plan.period == "monthly" and not plan.months:
+        raise HTTPException(status_code=400, detail="월별 예산에는 months가 필요합니다.")
+    # 월별 금액 목록은 months와 순서대로 짝지으므로 같은 월이 두 번 나오면 어느 금액인지 모호함
+    if plan.period == "monthly" and len(set(plan.months)) != len(plan.months):
+        raise HTTPException(status_code=400, detail="months에 중복된 월이 있습니다.")
+    months = sorted(plan.months) if plan.period == "monthly" else [None]
+    if any(not 1 <= month <= 12 for month in months if month is not None):
+        raise HTTPException(status_code=400, detail="월은 1~12 사이여야 합니다.")
+    
+    rows = []
+    for category, amounts in plan.categories.items():
+        if not category:
+            raise HTTPException(status_code=400, detail="카테고리 이름이 비어 있습니다.")
+        if isinstance(amounts, list):
+            if plan.period != "monthly" or len(amounts) != len(plan.months):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"{category}: 월별 금액 목록은 월별 예산에서 months와 같은 길이여야 합니다."
+                )
+            by_month = dict(zip(plan.months, amounts))
+        else:
+            by_month = {month: amounts for month in months}
         
-        result = supabase.table("budgets").insert(data).execute()
-        return {"message": "예산이 설정되었습니다.", "data": result.data[0]}
-    except HTTPException:
-        raise
+        for month in months:
+            amount = by_month[month]
+            if amount <= 0:
+                raise HTTPException(status_code=400, detail=f"{category}: 금액은 0보다 커야 합니다.")
+            rows.append({
+                "user_id": user_id,
+                "category": category,
+                "amount": amount,
+                "period": plan.period,
+                "year": plan.year,
+                "month": month
+            })
+    
+    try:
+        codes = await resolve_codes(supabase, user_id, list(plan.categories))
+        for row in rows:
+            row["category_id"] = codes[row.pop("category")]
+        
+        result = await supabase.table("budgets").upsert(rows, on_conflict=BUDGET_KEY).execute()
+        _budgets_changed(user_id)
+        return {
+            "message": f"{len(result.data)}개의 예산이 저장되었습니다.",
+            "count": len(result.data),
+            "data": await with_names(supabase, user_id, result.data)
+        }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("", response_model=List[dict])
+@router.get("", response_model=List[BudgetResponse], dependencies=[Depends(check_etag)])
+@coalesced
 async def get_budgets(
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     period: Optional[str] = Query(None, pattern="^(monthly|yearly)$"),
     year: Optional[int] = Query(None),
     month: Optional[int] = Query(None),
-    category: Optional[str] = Query(None)
+    category: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="응답에 포함할 필드 (쉼표 구분, 예: category,amount,month)")
 ):
     """예산 목록 조회"""
-    supabase = get_supabase_client()
-    
-    query = supabase.table("budgets").select("*").eq("user_id", user_id)
-    
-    if period:
-        query = query.eq("period", period)
-    if year:
-        query = query.eq("year", year)
-    if month:
-        query = query.eq("month", month)
-    if category:
-        query = query.eq("category", category)
+    supabase = get_async_client()
     
-    query = query.order("created_at", desc=True)
+    async def loader(category_id, columns):
+        query = supabase.table("budgets").select(columns).eq("user_id", user_id)
+        
+        if period:
+            query = query.eq("period", period)
+        if year:
+            query = query.eq("year", year)
+        if month:
+            query = query.eq("month", month)
+        if category_id is not None:
+            query = query.eq("category_id", category_id)
+        
+        query = query.order("created_at", desc=True)
+        return (await query.execute()).data
     
     try:
-        result = query.execute()
-        return result.data
+        names = parse_fields(fields, BudgetResponse)
+        columns = select_columns(names)
+        # 캐시에는 코드만 저장하고 이름은 응답할 때 붙임 (카테고리 이름 변경과 무관)
+        category_id = ((await load_dictionary(supabase, user_id)).code(category) or 0) if category else None
+        budgets = await cache.get_or_load(
+            "budgets", user_id, ("list", period, year, month, category_id, columns),
+            lambda: loader(category_id, columns)
+        )
+        if names is None or "category" in names:
+            budgets = await with_names(supabase, user_id, budgets)
+        return typed_list_response(BudgetResponse, project(budgets, names), response, names)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -91,18 +194,14 @@ async def update_budget(
     user_id: str = Depends(get_current_user_id)
 ):
     """예산 수정"""
-    supabase = get_supabase_client()
-    
-    update_data = {
-        "category": budget.category,
-        "amount": budget.amount,
-        "period": budget.period,
-        "year": budget.year,
-        "month": budget.month if budget.period == "monthly" else None
-    }
+    supabase = get_async_client()
     
     try:
-        result = supabase.table("budgets")\
+        codes = await resolve_codes(supabase, user_id, [budget.category])
+        update_data = _budget_row(user_id, budget, codes[budget.category])
+        del update_data["user_id"]
+        
+        result = await supabase.table("budgets")\
             .update(update_data)\
             .eq("id", budget_id)\
             .eq("user_id", user_id)\
@@ -111,10 +210,13 @@ async def update_budget(
         if not result.data:
             raise HTTPException(status_code=404, detail="예산을 찾을 수 없습니다.")
         
-        return {"message": "예산이 수정되었습니다.", "data": result.data[0]}
+        _budgets_changed(user_id)
+        return {"message": "예산이 수정되었습니다.", "data": (await with_names(supabase, user_id, result.data))[0]}
     except HTTPException:
         raise
     except Exception as e:
+        if is_unique_violation(e):
+            raise HTTPException(status_code=400, detail="해당 기간에 이미 예산이 설정되어 있습니다.")
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{budget_id}")
@@ -123,10 +225,10 @@ async def delete_budget(
     user_id: str = Depends(get_current_user_id)
 ):
     """예산 삭제"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
-        result = supabase.table("budgets")\
+        result = await supabase.table("budgets")\
             .delete()\
             .eq("id", budget_id)\
             .eq("user_id", user_id)\
@@ -135,126 +237,179 @@ async def delete_budget(
         if not result.data:
             raise HTTPException(status_code=404, detail="예산을 찾을 수 없습니다.")
         
+        _budgets_changed(user_id)
         return {"message": "예산이 삭제되었습니다."}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/status")
+async def load_budget_inputs(supabase, user_id, periods):
+    """여러 기간의 예산과 월간 집계를 동시에 조회
+    
+    periods: [(year, month 또는 None), ...]
+    반환값: ({(year, month): 예산 목록}, {year: 해당 연도 지출 프레임}, 카테고리 사전)
+    """
+    periods = list(dict.fromkeys(periods))
+    years = list(dict.fromkeys(year for year, _ in periods))
+    
+    # 예산(캐시 사용)과 연도별 집계는 서로 독립적이므로 한꺼번에 실행
+    dictionary, *results = await asyncio.gather(
+        load_dictionary(supabase, user_id),
+        *[load_period_budgets(supabase, user_id, year, month) for year, month in periods],
+        *[load_period_frame(supabase, user_id, year) for year in years]
+    )
+    budgets_by_period = dict(zip(periods, results[:len(periods)]))
+    frames_by_year = dict(zip(years, results[len(periods):]))
+    return budgets_by_period, frames_by_year, dictionary
+
+def build_budget_status(year, month, budgets, year_frame, dictionary):
+    """예산 목록과 연간 지출 프레임으로 기간별 예산 대비 지출 현황 계산"""
+    frame = year_frame.slice_period(year, month)
+    expense_by_category = {
+        category: totals["total_amount"]
+        for category, totals in frame.totals_by_category().items()
+    }
+    
+    budget_status = []
+    for budget in budgets:
+        category = dictionary.name(budget['category_id'])
+        budget_amount = float(budget['amount'])
+        spent_amount = expense_by_category.get(category, 0)
+        remaining = budget_amount - spent_amount
+        usage_percentage = (spent_amount / budget_amount * 100) if budget_amount > 0 else 0
+        
+        budget_status.append({
+            "category": category,
+            "budget_amount": budget_amount,
+            "spent_amount": spent_amount,
+            "remaining_amount": remaining,
+            "usage_percentage": round(usage_percentage, 2),
+            "is_over_budget": spent_amount > budget_amount,
+            "period": budget['period'],
+            "year": budget['year'],
+            "month": budget.get('month')
+        })
+    
+    return {
+        "period": f"{year}-{month:02d}" if month else str(year),
+        "budget_status": budget_status,
+        "total_budget": sum(b['budget_amount'] for b in budget_status),
+        "total_spent": sum(b['spent_amount'] for b in budget_status)
+    }
+
+def build_budget_alerts(status, threshold):
+    """예산 현황에서 임계값 이상 사용한 항목을 알림으로 변환"""
+    alerts = []
+    for budget in status['budget_status']:
+        if budget['usage_percentage'] >= threshold:
+            alert_type = "over_budget" if budget['is_over_budget'] else "warning"
+            alerts.append({
+                "type": alert_type,
+                "category": budget['category'],
+                "usage_percentage": budget['usage_percentage'],
+                "message": f"{budget['category']} 카테고리가 예산의 {budget['usage_percentage']:.1f}%를 사용했습니다."
+            })
+    
+    return {
+        "alerts": alerts,
+        "alert_count": len(alerts)
+    }
+
+async def compute_budget_status(supabase, user_id, periods):
+    """여러 기간의 예산 현황을 한 번의 조회 묶음으로 계산 - {(year, month): 현황}"""
+    budgets_by_period, frames_by_year, dictionary = await load_budget_inputs(supabase, user_id, periods)
+    return {
+        (year, month): build_budget_status(year, month, budgets, frames_by_year[year], dictionary)
+        for (year, month), budgets in budgets_by_period.items()
+    }
+
+@router.get("/status", dependencies=[Depends(check_etag)])
+@coalesced
 async def get_budget_status(
     user_id: str = Depends(get_current_user_id),
     year: int = Query(..., description="조회할 연도"),
-    month: Optional[int] = Query(None, description="조회할 월 (월별 예산용)")
+    month: Optional[int] = Query(None, description="조회할 월 (월별 예산용)"),
+    alert_threshold: Optional[float] = Query(None, description="지정 시 같은 계산으로 알림도 함께 반환 (퍼센트)")
 ):
     """예산 대비 지출 현황 조회"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
-        # 예산 조회
-        budget_query = supabase.table("budgets")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .eq("year", year)
-        
-        if month:
-            budget_query = budget_query.eq("period", "monthly").eq("month", month)
-        else:
-            budget_query = budget_query.eq("period", "yearly")
-        
-        budgets = budget_query.execute().data
-        
-        # 해당 기간 지출 조회
-        if month:
-            # 월별 조회 - calendar.monthrange로 정확한 마지막 날 계산
-            last_day = calendar.monthrange(year, month)[1]
-            start_date = f"{year}-{month:02d}-01"
-            end_date = f"{year}-{month:02d}-{last_day:02d}"
-        else:
-            # 연별 조회
-            start_date = f"{year}-01-01"
-            end_date = f"{year}-12-31"
-        
-        expense_query = supabase.table("expenses")\
-            .select("category, amount")\
-            .eq("user_id", user_id)\
-            .gte("date", start_date)\
-            .lte("date", end_date)
-        
-        expenses = expense_query.execute().data
-        
-        # 카테고리별 지출 집계
-        expense_by_category = {}
-        for expense in expenses:
-            category = expense['category']
-            if category not in expense_by_category:
-                expense_by_category[category] = 0
-            expense_by_category[category] += float(expense['amount'])
-        
-        # 예산 대비 지출 현황 계산
-        budget_status = []
-        for budget in budgets:
-            category = budget['category']
-            budget_amount = float(budget['amount'])
-            spent_amount = expense_by_category.get(category, 0)
-            remaining = budget_amount - spent_amount
-            usage_percentage = (spent_amount / budget_amount * 100) if budget_amount > 0 else 0
-            
-            budget_status.append({
-                "category": category,
-                "budget_amount": budget_amount,
-                "spent_amount": spent_amount,
-                "remaining_amount": remaining,
-                "usage_percentage": round(usage_percentage, 2),
-                "is_over_budget": spent_amount > budget_amount,
-                "period": budget['period'],
-                "year": budget['year'],
-                "month": budget.get('month')
-            })
-        
-        return {
-            "period": f"{year}-{month:02d}" if month else str(year),
-            "budget_status": budget_status,
-            "total_budget": sum(b['budget_amount'] for b in budget_status),
-            "total_spent": sum(b['spent_amount'] for b in budget_status)
-        }
+        status = (await compute_budget_status(supabase, user_id, [(year, month)]))[(year, month)]
+        if alert_threshold is not None:
+            status.update(build_budget_alerts(status, alert_threshold))
+        return status
         
     except Exception as e:
         print(f"Budget status error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/alerts")
+@coalesced
 async def get_budget_alerts(
     user_id: str = Depends(get_current_user_id),
     threshold: float = Query(80.0, description="알림 임계값 (퍼센트)")
 ):
     """예산 초과 위험 알림"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
-        from datetime import datetime
         current_date = datetime.now()
         current_year = current_date.year
         current_month = current_date.month
         
-        # 현재 월의 예산 상태 조회
-        status_response = await get_budget_status(user_id, current_year, current_month)
-        
-        alerts = []
-        for budget in status_response['budget_status']:
-            if budget['usage_percentage'] >= threshold:
-                alert_type = "over_budget" if budget['is_over_budget'] else "warning"
-                alerts.append({
-                    "type": alert_type,
-                    "category": budget['category'],
-                    "usage_percentage": budget['usage_percentage'],
-                    "message": f"{budget['category']} 카테고리가 예산의 {budget['usage_percentage']:.1f}%를 사용했습니다."
-                })
-        
-        return {
-            "alerts": alerts,
-            "alert_count": len(alerts)
-        }
+        # 현재 월의 예산 상태 계산
+        statuses = await compute_budget_status(supabase, user_id, [(current_year, current_month)])
+        return build_budget_alerts(statuses[(current_year, current_month)], threshold)
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/alerts/events")
+async def get_budget_alert_events(
+    user_id: str = Depends(get_current_user_id),
+    since: int = Query(0, ge=0, description="이 이벤트 id 이후만 조회")
+):
+    """지출 변경 시 기록된 예산 임계값 통과 이벤트 (데이터베이스 조회 없음)"""
+    events = hub.events_since(user_id, since)
+    return {"events": events, "last_event_id": hub.last_id}
+
+@router.get("/alerts/stream")
+async def stream_budget_alerts(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    last_event_id: Optional[int] = Query(None, ge=0, description="재접속 시 이어받을 마지막 이벤트 id")
+):
+    """예산 임계값 통과 이벤트 실시간 구독 (Server-Sent Events)"""
+    if last_event_id is None:
+        # EventSource는 재접속할 때 Last-Event-ID 헤더를 자동으로 보냄
+        header = request.headers.get("last-event-id", "")
+        last_event_id = int(header) if header.isdigit() else hub.last_id
+    
+    async def stream():
+        queue = hub.subscribe(user_id)
+        try:
+            sent_id = last_event_id
+            for event in hub.events_since(user_id, sent_id):
+                sent_id = event["id"]
+                yield format_sse(event)
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # 프록시가 연결을 끊지 않도록 주기적으로 주석 전송
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["id"] > sent_id:
+                    sent_id = event["id"]
+                    yield format_sse(event)
+        finally:
+            hub.unsubscribe(user_id, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
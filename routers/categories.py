@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional
 from models import CategoryCreate, CategoryResponse
-from database import get_supabase_client
+from database import get_async_client
+from analytics import load_period_frame
+from category_codes import load_categories
+from cache import cache
+from etag import etag_guard, bump_version
+from singleflight import coalesced
+from serialization import parse_fields, project, typed_list_response
 
 router = APIRouter(prefix="/categories", tags=["categories"])
 
@@ -9,13 +15,16 @@ router = APIRouter(prefix="/categories", tags=["categories"])
 def get_current_user_id():
     return "test-user"
 
+# 조회 API용 ETag 검사 (데이터 버전이 같으면 304)
+check_etag = etag_guard(get_current_user_id)
+
 @router.post("", response_model=dict)
 async def create_category(
     category: CategoryCreate,
     user_id: str = Depends(get_current_user_id)
 ):
     """카테고리 생성"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     data = {
         "user_id": user_id,
@@ -24,41 +33,40 @@ async def create_category(
     }
     
     try:
-        # 중복 카테고리 확인
-        existing = supabase.table("categories")\
-            .select("id")\
-            .eq("user_id", user_id)\
-            .eq("name", category.name)\
-            .execute()
-        
-        if existing.data:
+        # 중복 카테고리 확인 (캐시된 목록 사용)
+        categories = await load_categories(supabase, user_id)
+        if any(cat['name'] == category.name for cat in categories):
             raise HTTPException(
                 status_code=400, 
                 detail="이미 존재하는 카테고리명입니다."
             )
         
-        result = supabase.table("categories").insert(data).execute()
+        result = await supabase.table("categories").insert(data).execute()
+        cache.invalidate("categories", user_id)
+        bump_version(user_id)
         return {"message": "카테고리가 생성되었습니다.", "data": result.data[0]}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("", response_model=List[dict])
+@router.get("", response_model=List[CategoryResponse], dependencies=[Depends(check_etag)])
+@coalesced
 async def get_categories(
-    user_id: str = Depends(get_current_user_id)
+    response: Response,
+    user_id: str = Depends(get_current_user_id),
+    fields: Optional[str] = Query(None, description="응답에 포함할 필드 (쉼표 구분, 예: name,color)")
 ):
     """카테고리 목록 조회"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
-        result = supabase.table("categories")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .order("name")\
-            .execute()
-        
-        return result.data
+        names = parse_fields(fields, CategoryResponse)
+        # 카테고리 사전과 공유하는 캐시된 전체 목록에서 필드만 골라 응답 (별도 조회 없음)
+        categories = await load_categories(supabase, user_id)
+        return typed_list_response(CategoryResponse, project(categories, names), response, names)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -69,7 +77,7 @@ async def update_category(
     user_id: str = Depends(get_current_user_id)
 ):
     """카테고리 수정"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     update_data = {
         "name": category.name,
@@ -77,21 +85,15 @@ async def update_category(
     }
     
     try:
-        # 다른 카테고리와 이름 중복 확인
-        existing = supabase.table("categories")\
-            .select("id")\
-            .eq("user_id", user_id)\
-            .eq("name", category.name)\
-            .neq("id", category_id)\
-            .execute()
-        
-        if existing.data:
+        # 다른 카테고리와 이름 중복 확인 (캐시된 목록 사용)
+        categories = await load_categories(supabase, user_id)
+        if any(cat['name'] == category.name and str(cat['id']) != category_id for cat in categories):
             raise HTTPException(
                 status_code=400, 
                 detail="이미 존재하는 카테고리명입니다."
             )
         
-        result = supabase.table("categories")\
+        result = await supabase.table("categories")\
             .update(update_data)\
             .eq("id", category_id)\
             .eq("user_id", user_id)\
@@ -100,6 +102,10 @@ async def update_category(
         if not result.data:
             raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
         
+        # 지출/예산은 코드만 저장하므로 이름 변경은 이 행 하나로 끝나고, 이름을 붙여 둔 캐시만 무효화
+        cache.invalidate("categories", user_id)
+        cache.invalidate("analytics", user_id)
+        bump_version(user_id)
         return {"message": "카테고리가 수정되었습니다.", "data": result.data[0]}
     except HTTPException:
         raise
@@ -112,92 +118,60 @@ async def delete_category(
     user_id: str = Depends(get_current_user_id)
 ):
     """카테고리 삭제"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
-        # 해당 카테고리를 사용하는 지출이나 예산이 있는지 확인
-        expenses = supabase.table("expenses")\
-            .select("id")\
-            .eq("user_id", user_id)\
-            .eq("category", category_id)\
-            .limit(1)\
-            .execute()
-        
-        budgets = supabase.table("budgets")\
-            .select("id")\
+        # 사용 중 여부는 트리거가 유지하는 참조 수로 판단 (확인과 삭제를 조건부 DELETE 한 번으로)
+        result = await supabase.table("categories")\
+            .delete()\
+            .eq("id", category_id)\
             .eq("user_id", user_id)\
-            .eq("category", category_id)\
-            .limit(1)\
+            .eq("expense_count", 0)\
+            .eq("budget_count", 0)\
             .execute()
         
-        if expenses.data or budgets.data:
+        if not result.data:
+            existing = await supabase.table("categories")\
+                .select("id")\
+                .eq("id", category_id)\
+                .eq("user_id", user_id)\
+                .execute()
+            if not existing.data:
+                raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
             raise HTTPException(
                 status_code=400, 
                 detail="이 카테고리를 사용하는 지출이나 예산이 있어 삭제할 수 없습니다."
             )
         
-        result = supabase.table("categories")\
-            .delete()\
-            .eq("id", category_id)\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        if not result.data:
-            raise HTTPException(status_code=404, detail="카테고리를 찾을 수 없습니다.")
-        
+        cache.invalidate("categories", user_id)
+        bump_version(user_id)
         return {"message": "카테고리가 삭제되었습니다."}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/usage")
+@router.get("/usage", dependencies=[Depends(check_etag)])
+@coalesced
 async def get_category_usage(
     user_id: str = Depends(get_current_user_id),
     year: Optional[int] = Query(None),
     month: Optional[int] = Query(None)
 ):
     """카테고리별 사용 통계"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
         # 카테고리 목록 조회
-        categories = supabase.table("categories")\
-            .select("*")\
-            .eq("user_id", user_id)\
-            .execute().data
-        
-        # 지출 데이터 조회
-        expense_query = supabase.table("expenses")\
-            .select("category, amount")\
-            .eq("user_id", user_id)
+        categories = await load_categories(supabase, user_id)
         
-        if year:
-            expense_query = expense_query.gte("date", f"{year}-01-01").lte("date", f"{year}-12-31")
-            if month:
-                expense_query = expense_query\
-                    .gte("date", f"{year}-{month:02d}-01")\
-                    .lte("date", f"{year}-{month:02d}-31")
-        
-        expenses = expense_query.execute().data
-        
-        # 카테고리별 집계
-        usage_stats = {}
-        total_amount = 0
-        
-        for expense in expenses:
-            category = expense['category']
-            amount = expense['amount']
-            total_amount += amount
-            
-            if category not in usage_stats:
-                usage_stats[category] = {
-                    "total_amount": 0,
-                    "transaction_count": 0
-                }
-            
-            usage_stats[category]["total_amount"] += amount
-            usage_stats[category]["transaction_count"] += 1
+        # 카테고리별 집계 (집계 테이블이 없으면 지출 원본, 월은 연도와 함께 지정된 경우에만 적용)
+        frame = await load_period_frame(supabase, user_id, year, month)
+        usage_stats = {
+            category: {"total_amount": totals["total_amount"], "transaction_count": totals["count"]}
+            for category, totals in frame.totals_by_category().items()
+        }
+        total_amount = sum(stats["total_amount"] for stats in usage_stats.values())
         
         # 결과 정리
         result = []
@@ -232,7 +206,7 @@ async def initialize_default_categories(
     user_id: str = Depends(get_current_user_id)
 ):
     """기본 카테고리 초기화"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     default_categories = [
         {"name": "식비", "color": "#EF4444"},
@@ -247,12 +221,7 @@ async def initialize_default_categories(
     
     try:
         # 기존 카테고리 확인
-        existing = supabase.table("categories")\
-            .select("name")\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        existing_names = {cat['name'] for cat in existing.data}
+        existing_names = {cat['name'] for cat in await load_categories(supabase, user_id)}
         
         # 중복되지 않는 카테고리만 추가
         new_categories = []
@@ -265,7 +234,9 @@ async def initialize_default_categories(
                 })
         
         if new_categories:
-            result = supabase.table("categories").insert(new_categories).execute()
+            result = await supabase.table("categories").insert(new_categories).execute()
+            cache.invalidate("categories", user_id)
+            bump_version(user_id)
             return {
                 "message": f"{len(new_categories)}개의 기본 카테고리가 추가되었습니다.",
                 "added_categories": [cat['name'] for cat in new_categories]
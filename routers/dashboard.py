@@ -0,0 +1,90 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from datetime import datetime
+import asyncio
+from database import get_async_client
+from etag import etag_guard
+from singleflight import coalesced
+from .budgets import load_budget_inputs, build_budget_status, build_budget_alerts
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+# 임시 사용자 ID (실제로는 JWT 토큰에서 추출)
+def get_current_user_id():
+    return "test-user"
+
+# 조회 API용 ETag 검사 (데이터 버전이 같으면 304, 기준 월 기본값이 이번 달이므로 날짜도 반영)
+check_etag = etag_guard(get_current_user_id, by_date=True)
+
+@router.get("", dependencies=[Depends(check_etag)])
+@coalesced
+async def get_dashboard(
+    user_id: str = Depends(get_current_user_id),
+    year: Optional[int] = Query(None, description="기준 연도 (기본값: 올해)"),
+    month: Optional[int] = Query(None, ge=1, le=12, description="기준 월 (기본값: 이번 달)"),
+    category_period: str = Query("month", pattern="^(month|year)$", description="카테고리 분포 기간"),
+    alert_threshold: float = Query(80.0, description="예산 알림 임계값 (퍼센트)"),
+    recent_limit: int = Query(5, ge=0, le=50, description="최근 지출 개수")
+):
+    """대시보드 데이터 한 번에 조회 (월 합계, 예산 진행률/알림, 카테고리 분포, 월별 추이, 최근 지출)"""
+    supabase = get_async_client()
+
+    now = datetime.now()
+    year = year or now.year
+    month = month or now.month
+
+    async def load_recent():
+        if recent_limit == 0:
+            return []
+        result = await supabase.table("expenses")\
+            .select("*")\
+            .eq("user_id", user_id)\
+            .order("date", desc=True)\
+            .order("id", desc=True)\
+            .limit(recent_limit)\
+            .execute()
+        return result.data
+
+    try:
+        # 서로 독립적인 조회는 동시에 실행 (연간 지출 프레임 하나로 월/연 통계와 예산 현황을 모두 계산)
+        (budgets_by_period, frames_by_year, dictionary), recent_expenses = await asyncio.gather(
+            load_budget_inputs(supabase, user_id, [(year, month)]),
+            load_recent()
+        )
+        year_frame = frames_by_year[year]
+        month_by_category = year_frame.slice_period(year, month).totals_by_category()
+
+        # 월별 추이
+        monthly_trend = year_frame.totals_by_month()
+
+        # 카테고리 분포
+        breakdown_source = month_by_category if category_period == "month" else year_frame.totals_by_category()
+        category_breakdown = [{'category': k, **v} for k, v in breakdown_source.items()]
+        category_breakdown.sort(key=lambda x: x['total_amount'], reverse=True)
+
+        # 예산 진행률과 알림 (같은 계산 결과 공유)
+        status = build_budget_status(year, month, budgets_by_period[(year, month)], year_frame, dictionary)
+        alerts = build_budget_alerts(status, alert_threshold)
+
+        total_expense = sum(v['total_amount'] for v in month_by_category.values())
+        total_budget = status['total_budget']
+
+        return {
+            "period": f"{year}-{month:02d}",
+            "totals": {
+                "month_expense": total_expense,
+                "month_budget": total_budget,
+                "remaining_budget": total_budget - total_expense,
+                "budget_usage_percentage": round(total_expense / total_budget * 100, 2) if total_budget > 0 else 0,
+                "transaction_count": sum(v['count'] for v in month_by_category.values())
+            },
+            "budget_status": status['budget_status'],
+            "alerts": alerts['alerts'],
+            "category_breakdown": category_breakdown,
+            "monthly_trend": [{'month': k, 'total_amount': v} for k, v in monthly_trend.items()],
+            "recent_expenses": [
+                {**expense, "category": dictionary.name(expense["category_id"])} for expense in recent_expenses
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
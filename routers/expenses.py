@@ -1,8 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from datetime import date, datetime
-from models import ExpenseCreate, ExpenseUpdate, ExpenseResponse
-from database import get_supabase_client
+from datetime import date
+from pydantic import ValidationError
+import base64
+import csv
+import io
+import json
+import uuid
+from models import ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseBatchRequest
+from database import get_async_client
+from etag import etag_guard, bump_version
+from singleflight import coalesced
+from cache import cache
+from alerts import evaluate_thresholds
+from capabilities import get_capabilities
+from rollup import apply_expense_change, apply_deltas, collect_deltas, fetch_rollups
+from analytics import ExpenseFrame, load_expense_frame
+from category_codes import load_dictionary, resolve_codes, with_names
+from serialization import parse_fields, select_columns, project, typed_list_response
 
 router = APIRouter(prefix="/expenses", tags=["expenses"])
 
@@ -10,55 +26,310 @@ router = APIRouter(prefix="/expenses", tags=["expenses"])
 def get_current_user_id():
     return "test-user"  # 실제 UUID 형식
 
+# 조회 API용 ETag 검사 (데이터 버전이 같으면 304)
+check_etag = etag_guard(get_current_user_id)
+
 @router.post("", response_model=dict)
 async def create_expense(
     expense: ExpenseCreate,
     user_id: str = Depends(get_current_user_id)
 ):
     """지출 추가"""
-    supabase = get_supabase_client()
-    
-    data = {
-        "user_id": user_id,
-        "amount": expense.amount,
-        "category": expense.category,
-        "date": expense.date.isoformat(),
-        "description": expense.description
-    }
+    supabase = get_async_client()
     
     try:
-        result = supabase.table("expenses").insert(data).execute()
-        return {"message": "지출이 추가되었습니다.", "data": result.data[0]}
+        codes = await resolve_codes(supabase, user_id, [expense.category])
+        data = {
+            "user_id": user_id,
+            "amount": expense.amount,
+            "category_id": codes[expense.category],
+            "date": expense.date.isoformat(),
+            "description": expense.description
+        }
+        
+        result = await supabase.table("expenses").insert(data).execute()
+        changes = await apply_expense_change(supabase, user_id, new=result.data[0])
+        # 집계까지 끝난 뒤 버전 증가 (쓰는 도중의 조회가 새 ETag로 이전 집계를 응답하지 않도록)
+        bump_version(user_id)
+        cache.invalidate("analytics", user_id)
+        await evaluate_thresholds(supabase, user_id, changes)
+        return {"message": "지출이 추가되었습니다.", "data": (await with_names(supabase, user_id, result.data))[0]}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("", response_model=List[dict])
+def _normalize_id(expense_id):
+    """UUID 형식 id는 DB가 돌려주는 표준 형식(소문자)으로 맞춤 (대문자 UUID도 같은 지출로 취급)"""
+    try:
+        return str(uuid.UUID(expense_id))
+    except ValueError:
+        return expense_id
+
+@router.post("/batch")
+async def batch_expenses(
+    batch: ExpenseBatchRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """지출 일괄 생성/수정/삭제 (전부 적용되거나 전부 취소, 작업별 결과 반환)"""
+    supabase = get_async_client()
+    
+    results = []
+    creates, updates, deletes = [], [], []
+    invalid = False
+    seen_ids = set()
+    
+    # 작업별 검증 (하나라도 잘못되면 아무것도 적용하지 않음)
+    for index, operation in enumerate(batch.operations):
+        entry = {"index": index, "op": operation.op, "id": operation.id}
+        results.append(entry)
+        try:
+            if operation.op == "create":
+                expense = ExpenseCreate.model_validate(operation.data or {})
+                entry["id"] = str(uuid.uuid4())
+                creates.append({
+                    "id": entry["id"],
+                    "amount": expense.amount,
+                    "category": expense.category,
+                    "date": expense.date.isoformat(),
+                    "description": expense.description
+                })
+                continue
+            
+            if not operation.id:
+                raise ValueError("id가 필요합니다.")
+            entry["id"] = _normalize_id(operation.id)
+            if entry["id"] in seen_ids:
+                raise ValueError("한 요청에서 같은 지출을 여러 번 변경할 수 없습니다.")
+            seen_ids.add(entry["id"])
+            
+            if operation.op == "update":
+                expense = ExpenseUpdate.model_validate(operation.data or {})
+                update_data = {k: v for k, v in expense.model_dump().items() if v is not None}
+                if not update_data:
+                    raise ValueError("수정할 내용이 없습니다.")
+                if "date" in update_data:
+                    update_data["date"] = update_data["date"].isoformat()
+                updates.append({"id": entry["id"], **update_data})
+            else:
+                deletes.append({"id": entry["id"]})
+        except (ValidationError, ValueError) as e:
+            entry["status"] = "invalid"
+            entry["error"] = _validation_message(e)
+            invalid = True
+    
+    def rejected(status_code, message, failed_status, failed_ids=()):
+        for entry in results:
+            if entry.get("status") != "invalid":
+                entry["status"] = failed_status if entry["id"] in failed_ids else "skipped"
+        return HTTPException(status_code=status_code, detail={"message": message, "results": results})
+    
+    if invalid:
+        raise rejected(400, "잘못된 작업이 있어 아무것도 적용하지 않았습니다.", "skipped")
+    
+    try:
+        # 카테고리 이름을 코드로 변환 (요청 전체에서 한 번)
+        names = [row["category"] for row in creates + updates if "category" in row]
+        codes = await resolve_codes(supabase, user_id, names) if names else {}
+        for row in creates + updates:
+            if "category" in row:
+                row["category_id"] = codes[row.pop("category")]
+        
+        # 생성은 다중 행 INSERT, 삭제는 IN 조건 하나로 묶어 DB 함수 한 번(한 트랜잭션)에 처리
+        applied = (await supabase.rpc("apply_expense_batch", {
+            "p_user_id": user_id,
+            "p_creates": creates,
+            "p_updates": updates,
+            "p_deletes": deletes
+        }).execute()).data
+    except Exception as e:
+        raise rejected(400, str(e), "failed")
+    
+    if applied.get("missing"):
+        raise rejected(404, "지출 내역을 찾을 수 없어 아무것도 적용하지 않았습니다.", "not_found",
+                       set(map(str, applied["missing"])))
+    
+    dictionary = await load_dictionary(supabase, user_id)
+    
+    def named(row):
+        return {**row, "category": dictionary.name(row["category_id"])}
+    
+    rows = {str(row["id"]): ("created", named(row)) for row in applied["created"]}
+    rows.update((str(change["new"]["id"]), ("updated", named(change["new"]))) for change in applied["updated"])
+    rows.update((str(row["id"]), ("deleted", named(row))) for row in applied["deleted"])
+    for entry in results:
+        entry["status"], entry["data"] = rows.get(entry["id"], ("not_found", None))
+    
+    deltas = collect_deltas(applied["created"])
+    collect_deltas([change["new"] for change in applied["updated"]], deltas=deltas)
+    collect_deltas([change["old"] for change in applied["updated"]] + applied["deleted"], sign=-1, deltas=deltas)
+    try:
+        changes = await apply_deltas(supabase, user_id, deltas)
+    except Exception as e:
+        print(f"Rollup update error: {e}")
+        changes = {}
+    bump_version(user_id)
+    cache.invalidate("analytics", user_id)
+    await evaluate_thresholds(supabase, user_id, changes)
+    
+    return {
+        "message": f"{len(results)}건의 작업을 적용했습니다.",
+        "created": len(applied["created"]),
+        "updated": len(applied["updated"]),
+        "deleted": len(applied["deleted"]),
+        "results": results
+    }
+
+def _encode_cursor(row):
+    """마지막 행의 (date, id)를 불투명한 커서 문자열로 변환"""
+    raw = json.dumps([row["date"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_date, cursor_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(cursor_date), str(cursor_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다.")
+
+async def _category_filter(supabase, user_id, category):
+    """카테고리 이름 필터를 코드로 변환 (필터 없음: None, 없는 카테고리: 0 - 어떤 행과도 맞지 않음)"""
+    if not category:
+        return None
+    return (await load_dictionary(supabase, user_id)).code(category) or 0
+
+async def _fetch_expense_page(supabase, user_id, limit, cursor=None, category_id=None,
+                              start_date=None, end_date=None, columns="*"):
+    """(date desc, id desc) 순서의 키셋 페이지 조회 - 반환값: (rows, next_cursor)"""
+    def base_query():
+        query = supabase.table("expenses").select(columns).eq("user_id", user_id)
+        if category_id is not None:
+            query = query.eq("category_id", category_id)
+        if start_date:
+            query = query.gte("date", start_date.isoformat())
+        if end_date:
+            query = query.lte("date", end_date.isoformat())
+        return query
+    
+    # 다음 페이지 존재 여부 확인을 위해 한 행 더 조회
+    wanted = limit + 1
+    if cursor is None:
+        rows = (await base_query()
+            .order("date", desc=True)
+            .order("id", desc=True)
+            .limit(wanted)
+            .execute()).data
+    else:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        # 1) 커서와 같은 날짜의 나머지 행, 2) 그 이전 날짜 - 둘 다 인덱스 범위 스캔
+        rows = (await base_query()
+            .eq("date", cursor_date)
+            .lt("id", cursor_id)
+            .order("id", desc=True)
+            .limit(wanted)
+            .execute()).data
+        if len(rows) < wanted:
+            rows += (await base_query()
+                .lt("date", cursor_date)
+                .order("date", desc=True)
+                .order("id", desc=True)
+                .limit(wanted - len(rows))
+                .execute()).data
+    
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+@router.get("", response_model=List[ExpenseResponse], dependencies=[Depends(check_etag)])
+@coalesced
 async def get_expenses(
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     category: Optional[str] = Query(None),
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
-    limit: int = Query(100, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 값"),
+    fields: Optional[str] = Query(None, description="응답에 포함할 필드 (쉼표 구분, 예: id,amount,date)")
 ):
-    """지출 목록 조회 (필터링 가능)"""
-    supabase = get_supabase_client()
+    """지출 목록 조회 (필터링 가능, 커서 기반 페이지네이션)
     
-    query = supabase.table("expenses").select("*").eq("user_id", user_id)
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서를 반환합니다.
+    """
+    supabase = get_async_client()
     
-    if category:
-        query = query.eq("category", category)
-    if start_date:
-        query = query.gte("date", start_date.isoformat())
-    if end_date:
-        query = query.lte("date", end_date.isoformat())
+    try:
+        names = parse_fields(fields, ExpenseResponse)
+        category_id = await _category_filter(supabase, user_id, category)
+        # 커서를 만들 (date, id)는 요청하지 않아도 조회
+        rows, next_cursor = await _fetch_expense_page(
+            supabase, user_id, limit, cursor, category_id, start_date, end_date,
+            columns=select_columns(names, always=("date", "id"))
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        if names is None or "category" in names:
+            rows = await with_names(supabase, user_id, rows)
+        return typed_list_response(ExpenseResponse, project(rows, names), response, names)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+EXPORT_COLUMNS = ["id", "date", "category", "amount", "description", "created_at", "updated_at"]
+
+@router.get("/export")
+async def export_expenses(
+    user_id: str = Depends(get_current_user_id),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    category: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    page_size: int = Query(1000, ge=1, le=5000, description="백엔드에서 한 번에 가져올 행 수")
+):
+    """지출 내보내기 (CSV/NDJSON 스트리밍, 페이지 단위로 조회해 메모리 사용량 일정)"""
+    supabase = get_async_client()
+    columns = ", ".join("category_id" if column == "category" else column for column in EXPORT_COLUMNS)
     
-    query = query.order("date", desc=True).limit(limit)
+    async def fetch(cursor):
+        rows, next_cursor = await _fetch_expense_page(
+            supabase, user_id, page_size, cursor, category_id, start_date, end_date, columns
+        )
+        return await with_names(supabase, user_id, rows), next_cursor
     
+    def encode(rows, header=False):
+        if format == "ndjson":
+            return "".join(
+                json.dumps({column: row.get(column) for column in EXPORT_COLUMNS}, ensure_ascii=False) + "\n"
+                for row in rows
+            )
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buffer.getvalue()
+    
+    # 첫 페이지는 응답 전에 조회해 백엔드 오류를 400으로 돌려줌
     try:
-        result = query.execute()
-        return result.data
+        category_id = await _category_filter(supabase, user_id, category)
+        rows, next_cursor = await fetch(None)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    async def stream():
+        nonlocal rows, next_cursor
+        yield encode(rows, header=True)
+        while next_cursor:
+            rows, next_cursor = await fetch(next_cursor)
+            yield encode(rows)
+    
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        stream(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'}
+    )
 
 @router.put("/{expense_id}")
 async def update_expense(
@@ -67,7 +338,7 @@ async def update_expense(
     user_id: str = Depends(get_current_user_id)
 ):
     """지출 수정"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     # 업데이트할 데이터만 추출
     update_data = {k: v for k, v in expense.dict().items() if v is not None}
@@ -75,7 +346,21 @@ async def update_expense(
         update_data["date"] = update_data["date"].isoformat()
     
     try:
-        result = supabase.table("expenses")\
+        if "category" in update_data:
+            category = update_data.pop("category")
+            update_data["category_id"] = (await resolve_codes(supabase, user_id, [category]))[category]
+        
+        # 집계 반영을 위해 수정 전 값 조회
+        existing = await supabase.table("expenses")\
+            .select("amount, category_id, date")\
+            .eq("id", expense_id)\
+            .eq("user_id", user_id)\
+            .execute()
+        
+        if not existing.data:
+            raise HTTPException(status_code=404, detail="지출 내역을 찾을 수 없습니다.")
+        
+        result = await supabase.table("expenses")\
             .update(update_data)\
             .eq("id", expense_id)\
             .eq("user_id", user_id)\
@@ -84,7 +369,13 @@ async def update_expense(
         if not result.data:
             raise HTTPException(status_code=404, detail="지출 내역을 찾을 수 없습니다.")
         
-        return {"message": "지출이 수정되었습니다.", "data": result.data[0]}
+        changes = await apply_expense_change(supabase, user_id, old=existing.data[0], new=result.data[0])
+        bump_version(user_id)
+        cache.invalidate("analytics", user_id)
+        await evaluate_thresholds(supabase, user_id, changes)
+        return {"message": "지출이 수정되었습니다.", "data": (await with_names(supabase, user_id, result.data))[0]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -94,10 +385,10 @@ async def delete_expense(
     user_id: str = Depends(get_current_user_id)
 ):
     """지출 삭제"""
-    supabase = get_supabase_client()
+    supabase = get_async_client()
     
     try:
-        result = supabase.table("expenses")\
+        result = await supabase.table("expenses")\
             .delete()\
             .eq("id", expense_id)\
             .eq("user_id", user_id)\
@@ -106,86 +397,183 @@ async def delete_expense(
         if not result.data:
             raise HTTPException(status_code=404, detail="지출 내역을 찾을 수 없습니다.")
         
+        changes = await apply_expense_change(supabase, user_id, old=result.data[0])
+        bump_version(user_id)
+        cache.invalidate("analytics", user_id)
+        await evaluate_thresholds(supabase, user_id, changes)
         return {"message": "지출이 삭제되었습니다."}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/summary/category")
+@router.get("/summary/category", dependencies=[Depends(check_etag)])
+@coalesced
 async def get_category_summary(
     user_id: str = Depends(get_current_user_id),
     year: Optional[int] = Query(None),
-    month: Optional[int] = Query(None)
+    month: Optional[int] = Query(None, ge=1, le=12)
 ):
-    """카테고리별 지출 요약"""
-    supabase = get_supabase_client()
-    
-    # PostgreSQL 함수 호출 또는 직접 쿼리
-    query = """
-    SELECT 
-        category,
-        SUM(amount) as total_amount,
-        COUNT(*) as count,
-        AVG(amount) as avg_amount
-    FROM expenses 
-    WHERE user_id = %s
-    """
-    params = [user_id]
-    
-    if year:
-        query += " AND EXTRACT(YEAR FROM date) = %s"
-        params.append(year)
-    if month:
-        query += " AND EXTRACT(MONTH FROM date) = %s"
-        params.append(month)
-    
-    query += " GROUP BY category ORDER BY total_amount DESC"
+    """카테고리별 지출 요약 (합계, 건수, 평균)"""
+    supabase = get_async_client()
     
     try:
-        result = supabase.rpc('execute_sql', {
-            'query': query,
-            'params': params
-        }).execute()
-        return result.data
-    except Exception as e:
-        # 간단한 대안: Python에서 집계
-        expenses = supabase.table("expenses").select("*").eq("user_id", user_id).execute()
+        capabilities = await get_capabilities(supabase)
+        dictionary = await load_dictionary(supabase, user_id)
         
-        summary = {}
-        for expense in expenses.data:
-            cat = expense['category']
-            if cat not in summary:
-                summary[cat] = {'total_amount': 0, 'count': 0}
-            summary[cat]['total_amount'] += expense['amount']
-            summary[cat]['count'] += 1
+        if capabilities["expense_rollups"]:
+            rollups = await fetch_rollups(supabase, user_id, year, month, "year, month, category_id, total_amount, count")
+            summary = ExpenseFrame.from_rollups(rollups, dictionary.by_code).totals_by_category()
+        elif capabilities["category_expense_summary"]:
+            result = await supabase.rpc("category_expense_summary", {
+                "p_user_id": user_id,
+                "p_year": year,
+                "p_month": month
+            }).execute()
+            summary = {
+                dictionary.name(row['category_id']): {'total_amount': float(row['total_amount']), 'count': int(row['count'])}
+                for row in result.data
+            }
+        else:
+            # 기간 조건은 DB에서 적용 (연도 없이 월만 지정한 경우만 프레임에서 거름)
+            frame = await load_expense_frame(supabase, user_id, year, month)
+            summary = frame.slice_period(year, month).totals_by_category()
         
-        return [{'category': k, **v} for k, v in summary.items()]
+        result = [
+            {'category': k, **v, 'avg_amount': v['total_amount'] / v['count'] if v['count'] else 0}
+            for k, v in summary.items()
+        ]
+        result.sort(key=lambda x: x['total_amount'], reverse=True)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/summary/monthly")
+@router.get("/summary/monthly", dependencies=[Depends(check_etag)])
+@coalesced
 async def get_monthly_summary(
     user_id: str = Depends(get_current_user_id),
     year: Optional[int] = Query(None)
 ):
     """월별 지출 요약"""
-    supabase = get_supabase_client()
-    
-    query = supabase.table("expenses").select("*").eq("user_id", user_id)
-    
-    if year:
-        query = query.gte("date", f"{year}-01-01").lte("date", f"{year}-12-31")
+    supabase = get_async_client()
     
     try:
-        result = query.execute()
+        capabilities = await get_capabilities(supabase)
         
-        # Python에서 월별 집계
-        monthly_summary = {}
-        for expense in result.data:
-            expense_date = datetime.fromisoformat(expense['date'])
-            month_key = f"{expense_date.year}-{expense_date.month:02d}"
-            
-            if month_key not in monthly_summary:
-                monthly_summary[month_key] = 0
-            monthly_summary[month_key] += expense['amount']
+        if capabilities["expense_rollups"]:
+            rollups = await fetch_rollups(supabase, user_id, year, columns="year, month, category_id, total_amount, count")
+            monthly_summary = ExpenseFrame.from_rollups(rollups, {}).totals_by_month()
+        elif capabilities["monthly_expense_summary"]:
+            result = await supabase.rpc("monthly_expense_summary", {
+                "p_user_id": user_id,
+                "p_year": year
+            }).execute()
+            monthly_summary = {row['month']: float(row['total_amount']) for row in result.data}
+        else:
+            frame = await load_expense_frame(supabase, user_id, year)
+            monthly_summary = frame.totals_by_month()
         
         return [{'month': k, 'total_amount': v} for k, v in sorted(monthly_summary.items())]
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+def _iter_import_records(text, file_format):
+    """업로드 파일에서 (행 번호, 레코드) 를 한 행씩 생성 (전체를 메모리에 올리지 않음)"""
+    if file_format == "ndjson":
+        for line_no, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, ValueError(f"JSON 형식 오류: {e.msg}")
+    else:
+        reader = csv.DictReader(text)
+        for row_no, row in enumerate(reader, start=1):
+            yield row_no, {k.strip(): (v if v != "" else None) for k, v in row.items() if k}
+
+def _validation_message(error):
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in error.errors()
+        )
+    return str(error)
+
+@router.post("/import")
+async def import_expenses(
+    file: UploadFile = File(..., description="CSV(amount,category,date,description 헤더) 또는 NDJSON 파일"),
+    user_id: str = Depends(get_current_user_id),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="미지정 시 파일 확장자로 판단"),
+    chunk_size: int = Query(500, ge=1, le=5000, description="한 번에 삽입할 행 수"),
+    max_errors: int = Query(1000, ge=0, le=10000, description="응답에 포함할 최대 오류 수")
+):
+    """지출 일괄 가져오기 (청크 단위 검증 및 다중 행 삽입)"""
+    supabase = get_async_client()
+    
+    file_format = format or (
+        "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    )
+    
+    report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": []}
+    
+    def record_error(row_no, message):
+        report["failed"] += 1
+        if len(report["errors"]) < max_errors:
+            report["errors"].append({"row": row_no, "error": message})
+    
+    async def flush(chunk):
+        try:
+            codes = await resolve_codes(supabase, user_id, [data["category"] for _, data in chunk])
+            for _, data in chunk:
+                data["category_id"] = codes[data.pop("category")]
+            result = await supabase.table("expenses").insert([data for _, data in chunk]).execute()
+        except Exception as e:
+            for row_no, _ in chunk:
+                record_error(row_no, str(e))
+            return
+        report["imported"] += len(result.data)
+        try:
+            changes = await apply_deltas(supabase, user_id, collect_deltas(result.data))
+        except Exception as e:
+            print(f"Rollup update error: {e}")
+            changes = {}
+        bump_version(user_id)
+        cache.invalidate("analytics", user_id)
+        await evaluate_thresholds(supabase, user_id, changes)
+    
+    # 업로드 파일은 디스크에 임시 저장되어 있으므로 한 행씩 읽어 청크로 처리
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        chunk = []
+        for row_no, record in _iter_import_records(text, file_format):
+            report["total_rows"] += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                expense = ExpenseCreate.model_validate(record)
+            except (ValidationError, ValueError, TypeError) as e:
+                record_error(row_no, _validation_message(e))
+                continue
+            
+            chunk.append((row_no, {
+                "user_id": user_id,
+                "amount": expense.amount,
+                "category": expense.category,
+                "date": expense.date.isoformat(),
+                "description": expense.description
+            }))
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+        
+        if chunk:
+            await flush(chunk)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"파일을 읽을 수 없습니다: {e}")
+    finally:
+        text.detach()
+    
+    return {
+        "message": f"{report['imported']}건의 지출을 가져왔습니다.",
+        **report
+    }
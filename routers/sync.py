@@ -0,0 +1,86 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+import asyncio
+from models import ExpenseResponse, BudgetResponse, CategoryResponse
+from database import get_async_client
+from category_codes import CATEGORY_COLUMNS, with_names
+from changelog import head, changes_since, collapse
+from serialization import typed_rows
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+# 임시 사용자 ID (실제로는 JWT 토큰에서 추출)
+def get_current_user_id():
+    return "test-user"
+
+# 바뀐 행을 id로 다시 조회할 때 IN 조건 하나에 넣는 id 수 (URL 길이 제한)
+FETCH_CHUNK = 200
+
+ENTITY_MODELS = {
+    "expenses": (ExpenseResponse, "*"),
+    "budgets": (BudgetResponse, "*"),
+    "categories": (CategoryResponse, CATEGORY_COLUMNS),
+}
+
+async def _fetch_rows(supabase, user_id, entity, ids):
+    """바뀐 id의 현재 행 (그사이 삭제된 행은 결과에 없음)"""
+    if not ids:
+        return []
+    model, columns = ENTITY_MODELS[entity]
+    results = await asyncio.gather(*(
+        supabase.table(entity)
+            .select(columns)
+            .eq("user_id", user_id)
+            .in_("id", ids[i:i + FETCH_CHUNK])
+            .execute()
+        for i in range(0, len(ids), FETCH_CHUNK)
+    ))
+    rows = [row for result in results for row in result.data]
+    if entity != "categories":
+        rows = await with_names(supabase, user_id, rows)
+    return typed_rows(model, rows)
+
+@router.get("")
+async def sync_changes(
+    user_id: str = Depends(get_current_user_id),
+    since: Optional[int] = Query(None, ge=0, description="이전 응답의 cursor 값 (없으면 현재 커서만 반환)"),
+    limit: int = Query(1000, ge=1, le=5000, description="한 번에 반영할 최대 변경 기록 수")
+):
+    """증분 동기화 - since 이후 바뀐 행(changes)과 삭제된 id(deleted), 다음 커서 반환
+    
+    has_more가 true면 받은 cursor로 다시 요청합니다. 커서가 서버의 마지막 변경
+    번호보다 크면(데이터베이스 초기화 등) 410을 반환하므로 전체 목록을 다시 받아야 합니다.
+    """
+    supabase = get_async_client()
+    
+    try:
+        cursor = await head(supabase, user_id)
+        changes = {entity: [] for entity in ENTITY_MODELS}
+        deleted = {entity: [] for entity in ENTITY_MODELS}
+    
+        # 처음 동기화: 현재 커서만 받고 목록은 각 목록 API로 조회
+        if since is None or since == cursor:
+            return {"cursor": cursor, "has_more": False, "changes": changes, "deleted": deleted}
+        if since > cursor:
+            raise HTTPException(status_code=410, detail="동기화 커서가 만료되었습니다. 전체 목록을 다시 불러오세요.")
+    
+        entries, has_more = await changes_since(supabase, user_id, since, limit)
+        if entries:
+            cursor = entries[-1]["seq"]
+    
+        collapsed = collapse(entries)
+        fetched = await asyncio.gather(*(
+            _fetch_rows(supabase, user_id, entity, upserted)
+            for entity, (upserted, _) in collapsed.items()
+        ))
+        for (entity, (upserted, removed)), rows in zip(collapsed.items(), fetched):
+            changes[entity] = rows
+            # 기록 이후 삭제되어 조회되지 않은 행도 삭제로 전달
+            found = {str(row["id"]) for row in rows}
+            deleted[entity] = removed + [entity_id for entity_id in upserted if entity_id not in found]
+    
+        return {"cursor": cursor, "has_more": has_more, "changes": changes, "deleted": deleted}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
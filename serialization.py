@@ -0,0 +1,75 @@
+"""
+응답 직렬화와 희소 필드셋 (?fields=id,amount,date)
+
+앱 기본 응답 클래스는 ORJSONResponse이고, 목록 API는 typed_list_response()로
+행을 응답 모델의 필드 타입으로 검증한 뒤 orjson으로 인코딩합니다. 검증은 모델과
+같은 필드의 TypedDict로 하므로 행마다 모델 인스턴스를 만들고 다시 dict로 바꾸는
+FastAPI 기본 경로의 비용이 없습니다.
+
+fields=를 주면 요청한 필드만 백엔드에서 조회하고 응답에도 그 필드만 포함합니다.
+카테고리 이름(category)은 category_id 열로 조회해 이름을 붙입니다.
+"""
+
+from typing import List
+from typing_extensions import NotRequired, TypedDict
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+_adapters = {}  # (응답 모델, 필드 집합) -> 같은 필드의 List[TypedDict] TypeAdapter
+
+def parse_fields(fields, model):
+    """fields 쿼리 값을 필드 이름 목록으로 (없으면 None = 전체 필드)"""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in model.model_fields]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 필드입니다: {', '.join(unknown)} (사용 가능: {', '.join(model.model_fields)})"
+        )
+    return names
+
+def select_columns(names, always=()):
+    """백엔드 select 열 목록 (전체 필드면 "*", category는 category_id로 조회)"""
+    if names is None:
+        return "*"
+    columns = ["category_id" if name == "category" else name for name in [*names, *always]]
+    return ",".join(dict.fromkeys(columns))
+
+def project(rows, names):
+    """요청한 필드만 남긴 행 목록 (전체 필드면 그대로)"""
+    if names is None:
+        return rows
+    return [{name: row[name] for name in names if name in row} for row in rows]
+
+def _row_adapter(model, names=None):
+    key = (model, frozenset(names) if names is not None else None)
+    adapter = _adapters.get(key)
+    if adapter is None:
+        # fields=로 고른 필드만 가진 TypedDict - 필수 여부는 응답 모델을 따름
+        fields = model.model_fields if names is None else {name: model.model_fields[name] for name in names}
+        row_type = TypedDict(
+            f"{model.__name__}Row",
+            {
+                name: field.annotation if field.is_required() else NotRequired[field.annotation]
+                for name, field in fields.items()
+            }
+        )
+        adapter = _adapters[key] = TypeAdapter(List[row_type])
+    return adapter
+
+def typed_rows(model, rows, names=None):
+    """행 목록을 model(names를 주면 그 필드만)의 필드 타입으로 검증한 dict 목록 (다른 열은 제외)"""
+    return _row_adapter(model, names).validate_python(rows)
+
+def typed_list_response(model, rows, response=None, names=None):
+    """행 목록을 model(names를 주면 그 필드만)의 필드 타입으로 검증해 JSON으로 응답 (다른 열은 제외)
+
+    response에는 의존성이 설정한 헤더(ETag, X-Next-Cursor 등)가 담긴 Response를 넘깁니다.
+    """
+    return ORJSONResponse(
+        typed_rows(model, rows, names),
+        headers=dict(response.headers) if response is not None else None
+    )
@@ -0,0 +1,77 @@
+"""
+동일한 동시 조회 요청 합치기 (single-flight)
+
+같은 사용자가 같은 조회 API를 같은 파라미터로 동시에 여러 번 호출하면
+(예: 첫 화면 로드와 탭 전환이 겹칠 때) 처음 요청만 백엔드를 조회하고,
+처리 중에 도착한 나머지 요청은 그 결과의 복사본을 받습니다.
+
+키에는 사용자의 데이터 버전(etag.get_version)이 들어갑니다. 쓰기 핸들러는 집계/변경
+기록까지 끝난 뒤 버전을 올리므로, 쓰기가 끝난 뒤 도착한 요청은 쓰기 도중에 시작된
+계산에 합류하지 않고 새로 조회합니다. 버전을 올리지 않고 데이터를 바꾸는 경로가
+생기면 이 보장이 깨지므로 모든 쓰기는 마지막에 bump_version을 호출해야 합니다.
+결과를 보관하지 않고 처리 중인 요청끼리만 공유합니다.
+"""
+
+import asyncio
+import copy
+import functools
+from fastapi import Request, Response
+from etag import get_version
+from metrics import SINGLEFLIGHT
+
+_inflight = {}  # 키 -> 결과 Future
+
+def _copy(result):
+    """합류한 요청마다 결과 복사본 (응답 객체는 본문/헤더를 복사한 새 응답)"""
+    if isinstance(result, Response):
+        copied = Response(result.body, status_code=result.status_code)
+        copied.raw_headers = list(result.raw_headers)
+        return copied
+    return copy.deepcopy(result)
+
+def coalesced(handler):
+    """조회 핸들러 데코레이터 - (핸들러, user_id, 데이터 버전, 파라미터)가 같은 동시 요청을 합침
+
+    스트리밍 응답을 반환하는 핸들러에는 사용하지 않습니다.
+    """
+    name = f"{handler.__module__}.{handler.__name__}"
+
+    @functools.wraps(handler)
+    async def wrapper(**kwargs):
+        user_id = kwargs.get("user_id")
+        params = tuple(sorted(
+            (key, repr(value)) for key, value in kwargs.items()
+            if not isinstance(value, (Request, Response))
+        ))
+        key = (name, user_id, get_version(user_id), params)
+
+        future = _inflight.get(key)
+        if future is not None:
+            SINGLEFLIGHT.inc(name, "follower")
+            try:
+                return _copy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 처음 요청이 취소되었으면 직접 계산
+                return await handler(**kwargs)
+
+        SINGLEFLIGHT.inc(name, "leader")
+        future = _inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await handler(**kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 합류한 요청이 없어도 "exception was never retrieved" 경고가 나지 않게 표시
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del _inflight[key]
+
+    return wrapper
@@ -0,0 +1,340 @@
+-- Supabase(PostgreSQL)용 집계 함수
+-- Supabase 대시보드의 SQL Editor에서 실행하면 rpc()로 호출할 수 있습니다.
+
+-- 카테고리 정수 코드와 참조 수
+-- 지출/예산/집계는 카테고리 이름 대신 categories.code를 저장하고, 카테고리별 지출/예산 수는
+-- 트리거가 유지합니다 (삭제 가능 여부를 행 하나로 판단). 여러 번 실행해도 안전합니다.
+alter table categories add column if not exists code bigint generated always as identity;
+alter table categories add column if not exists expense_count int not null default 0;
+alter table categories add column if not exists budget_count int not null default 0;
+create unique index if not exists uq_categories_code on categories (code);
+
+delete from categories c
+using categories d
+where c.user_id = d.user_id and c.name = d.name
+  and (c.created_at, c.id::text) > (d.created_at, d.id::text);
+
+create unique index if not exists uq_categories_user_name on categories (user_id, name);
+
+do $$
+begin
+    if exists (select 1 from information_schema.columns
+               where table_name = 'expenses' and column_name = 'category') then
+        -- 지출/예산에만 있던 이름도 카테고리로 등록
+        insert into categories (user_id, name, color)
+        select user_id, category, '#6B7280' from expenses
+        union
+        select user_id, category, '#6B7280' from budgets
+        on conflict (user_id, name) do nothing;
+
+        alter table expenses add column category_id bigint references categories (code);
+        update expenses e set category_id = c.code
+        from categories c where c.user_id = e.user_id and c.name = e.category;
+        alter table expenses alter column category_id set not null;
+        alter table expenses drop column category;
+
+        alter table budgets add column category_id bigint references categories (code);
+        update budgets b set category_id = c.code
+        from categories c where c.user_id = b.user_id and c.name = b.category;
+        alter table budgets alter column category_id set not null;
+        alter table budgets drop column category;
+    end if;
+
+    if exists (select 1 from information_schema.columns
+               where table_name = 'expense_rollups' and column_name = 'category') then
+        alter table expense_rollups add column category_id bigint;
+        update expense_rollups r set category_id = c.code
+        from categories c where c.user_id = r.user_id and c.name = r.category;
+        alter table expense_rollups drop constraint expense_rollups_pkey;
+        alter table expense_rollups drop column category;
+        alter table expense_rollups alter column category_id set not null;
+        alter table expense_rollups add primary key (user_id, year, month, category_id);
+    end if;
+end;
+$$;
+
+create index if not exists idx_expenses_user_category on expenses (user_id, category_id, date);
+
+-- 참조 수 유지 트리거
+create or replace function track_category_refs()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'UPDATE' and old.category_id is not distinct from new.category_id then
+        return null;
+    end if;
+
+    if tg_op in ('UPDATE', 'DELETE') then
+        if tg_table_name = 'expenses' then
+            update categories set expense_count = expense_count - 1 where code = old.category_id;
+        else
+            update categories set budget_count = budget_count - 1 where code = old.category_id;
+        end if;
+    end if;
+
+    if tg_op in ('UPDATE', 'INSERT') then
+        if tg_table_name = 'expenses' then
+            update categories set expense_count = expense_count + 1 where code = new.category_id;
+        else
+            update categories set budget_count = budget_count + 1 where code = new.category_id;
+        end if;
+    end if;
+
+    return null;
+end;
+$$;
+
+create or replace trigger trg_expenses_category_refs
+    after insert or delete or update of category_id on expenses
+    for each row execute function track_category_refs();
+
+create or replace trigger trg_budgets_category_refs
+    after insert or delete or update of category_id on budgets
+    for each row execute function track_category_refs();
+
+update categories c set
+    expense_count = (select count(*) from expenses e where e.category_id = c.code),
+    budget_count = (select count(*) from budgets b where b.category_id = c.code);
+
+-- 월별 지출 합계 (/api/expenses/summary/monthly)
+create or replace function monthly_expense_summary(p_user_id text, p_year int default null)
+returns table (month text, total_amount numeric)
+language sql stable
+as $$
+    select to_char(date_trunc('month', e.date), 'YYYY-MM') as month,
+           sum(e.amount) as total_amount
+    from expenses e
+    where e.user_id = p_user_id
+      and (p_year is null
+           or (e.date >= make_date(p_year, 1, 1) and e.date < make_date(p_year + 1, 1, 1)))
+    group by 1
+    order by 1;
+$$;
+
+-- 카테고리별 지출 합계/건수/평균 (/api/expenses/summary/category, 집계 테이블이 없을 때 사용)
+drop function if exists category_expense_summary(text, int, int);
+create or replace function category_expense_summary(
+    p_user_id text, p_year int default null, p_month int default null
+)
+returns table (category_id bigint, total_amount numeric, count bigint, avg_amount numeric)
+language sql stable
+as $$
+    select e.category_id, sum(e.amount), count(*), avg(e.amount)
+    from expenses e
+    where e.user_id = p_user_id
+      and (p_year is null
+           or (e.date >= make_date(p_year, coalesce(p_month, 1), 1)
+               and e.date < case when p_month is null then make_date(p_year + 1, 1, 1)
+                                 else make_date(p_year, p_month, 1) + interval '1 month' end))
+      and (p_month is null or p_year is not null or extract(month from e.date) = p_month)
+    group by e.category_id
+    order by 2 desc;
+$$;
+
+-- 지출 목록 키셋 페이지네이션 ((date desc, id desc) 순서)
+create index if not exists idx_expenses_user_date_id on expenses (user_id, date desc, id desc);
+
+-- 사용자별 월간 카테고리 지출 집계 (요약 API가 지출 원본 대신 읽는 테이블)
+create table if not exists expense_rollups (
+    user_id text not null,
+    year int not null,
+    month int not null,
+    category_id bigint not null,
+    total_amount numeric not null default 0,
+    count int not null default 0,
+    primary key (user_id, year, month, category_id)
+);
+
+-- 집계 증감 (지출 생성/수정/삭제 시 호출, 건수가 0이 되면 행 삭제)
+drop function if exists bump_expense_rollup(text, int, int, text, numeric, int);
+create or replace function bump_expense_rollup(
+    p_user_id text, p_year int, p_month int, p_category_id bigint, p_amount numeric, p_count int
+)
+returns setof expense_rollups
+language plpgsql
+as $$
+begin
+    return query
+    insert into expense_rollups as r (user_id, year, month, category_id, total_amount, count)
+    values (p_user_id, p_year, p_month, p_category_id, p_amount, p_count)
+    on conflict (user_id, year, month, category_id) do update
+        set total_amount = r.total_amount + excluded.total_amount,
+            count = r.count + excluded.count
+    returning r.*;
+
+    delete from expense_rollups
+    where user_id = p_user_id and year = p_year and month = p_month
+      and category_id = p_category_id and count <= 0;
+end;
+$$;
+
+-- 집계 재생성 (p_user_id가 null이면 전체 사용자)
+create or replace function rebuild_expense_rollups(p_user_id text default null)
+returns int
+language plpgsql
+as $$
+declare
+    n int;
+begin
+    delete from expense_rollups where p_user_id is null or user_id = p_user_id;
+
+    insert into expense_rollups (user_id, year, month, category_id, total_amount, count)
+    select e.user_id, extract(year from e.date)::int, extract(month from e.date)::int,
+           e.category_id, sum(e.amount), count(*)
+    from expenses e
+    where p_user_id is null or e.user_id = p_user_id
+    group by 1, 2, 3, 4;
+
+    get diagnostics n = row_count;
+    return n;
+end;
+$$;
+
+-- 지출 일괄 생성/수정/삭제 (/api/expenses/batch)
+-- 함수 하나가 한 트랜잭션이므로 전부 적용되거나 전부 취소됩니다.
+-- p_creates/p_updates는 expenses 열 이름을 키로 하는 객체 배열, p_deletes는 {"id": ...} 배열입니다.
+-- 수정 시 객체에 없는 열은 기존 값을 유지합니다.
+create or replace function apply_expense_batch(
+    p_user_id text,
+    p_creates jsonb default '[]',
+    p_updates jsonb default '[]',
+    p_deletes jsonb default '[]'
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_missing jsonb;
+    v_created jsonb;
+    v_updated jsonb;
+    v_deleted jsonb;
+begin
+    -- 수정/삭제 대상이 모두 있어야 적용
+    select coalesce(jsonb_agg(t.id), '[]'::jsonb) into v_missing
+    from (
+        select r.id from jsonb_populate_recordset(null::expenses, p_updates) r
+        union all
+        select r.id from jsonb_populate_recordset(null::expenses, p_deletes) r
+    ) t
+    where not exists (select 1 from expenses e where e.id = t.id and e.user_id = p_user_id);
+
+    if jsonb_array_length(v_missing) > 0 then
+        return jsonb_build_object('missing', v_missing);
+    end if;
+
+    with ins as (
+        insert into expenses (id, user_id, amount, category_id, date, description)
+        select r.id, p_user_id, r.amount, r.category_id, r.date, r.description
+        from jsonb_populate_recordset(null::expenses, p_creates) r
+        returning *
+    )
+    select coalesce(jsonb_agg(to_jsonb(ins)), '[]'::jsonb) into v_created from ins;
+
+    with src as (
+        select u as raw, r.*
+        from jsonb_array_elements(p_updates) u,
+             lateral jsonb_populate_record(null::expenses, u) r
+    ),
+    old as (
+        select e.* from expenses e join src on e.id = src.id
+        where e.user_id = p_user_id
+        for update of e
+    ),
+    upd as (
+        update expenses e set
+            amount = case when s.raw ? 'amount' then s.amount else e.amount end,
+            category_id = case when s.raw ? 'category_id' then s.category_id else e.category_id end,
+            date = case when s.raw ? 'date' then s.date else e.date end,
+            description = case when s.raw ? 'description' then s.description else e.description end
+        from src s join old o on o.id = s.id
+        where e.id = s.id and e.user_id = p_user_id
+        returning jsonb_build_object('old', to_jsonb(o), 'new', to_jsonb(e)) as change
+    )
+    select coalesce(jsonb_agg(change), '[]'::jsonb) into v_updated from upd;
+
+    with del as (
+        delete from expenses e
+        using jsonb_populate_recordset(null::expenses, p_deletes) r
+        where e.id = r.id and e.user_id = p_user_id
+        returning e.*
+    )
+    select coalesce(jsonb_agg(to_jsonb(del)), '[]'::jsonb) into v_deleted from del;
+
+    -- 확인 후 다른 요청이 지운 행이 있으면 전체 취소
+    if jsonb_array_length(v_updated) <> jsonb_array_length(p_updates)
+       or jsonb_array_length(v_deleted) <> jsonb_array_length(p_deletes) then
+        raise exception '일괄 처리 중 대상 지출이 변경되었습니다.';
+    end if;
+
+    return jsonb_build_object('created', v_created, 'updated', v_updated, 'deleted', v_deleted, 'missing', '[]'::jsonb);
+end;
+$$;
+
+-- 예산 고유 키 (동시 요청의 중복 예산 방지, /api/budgets upsert 충돌 대상)
+-- 연간 예산은 month가 null이므로 null끼리도 같은 값으로 취급 (PostgreSQL 15 이상)
+delete from budgets b
+using budgets d
+where b.user_id = d.user_id and b.category_id = d.category_id and b.period = d.period
+  and b.year = d.year and b.month is not distinct from d.month
+  and (b.created_at, b.id::text) < (d.created_at, d.id::text);
+
+create unique index if not exists uq_budgets_key
+    on budgets (user_id, category_id, period, year, month) nulls not distinct;
+
+-- 증분 동기화용 변경 기록 (/api/sync)
+-- 지출/예산/카테고리 쓰기마다 트리거가 같은 트랜잭션에서 바뀐 id를 기록하고,
+-- 클라이언트는 마지막으로 받은 seq 이후의 기록만 조회합니다.
+create table if not exists change_log (
+    seq bigserial primary key,
+    user_id text not null,
+    entity text not null,
+    entity_id text not null,
+    op text not null check (op in ('upsert', 'delete')),
+    changed_at timestamptz not null default now()
+);
+
+create index if not exists idx_change_log_user_seq on change_log (user_id, seq);
+
+drop function if exists record_changes(text, jsonb);
+
+-- 변경 기록 트리거 (테이블 이름을 entity로 기록)
+-- 시퀀스 값은 커밋 순서와 다를 수 있으므로 사용자별 잠금으로 기록을 직렬화
+-- (앞 번호가 커밋되기 전에 뒤 번호를 읽고 커서를 넘겨 앞 기록을 놓치는 일 방지)
+create or replace function log_change()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_user_id text;
+    v_id text;
+begin
+    if tg_op = 'DELETE' then
+        v_user_id := old.user_id;
+        v_id := old.id::text;
+    else
+        v_user_id := new.user_id;
+        v_id := new.id::text;
+    end if;
+
+    perform pg_advisory_xact_lock(hashtext('change_log:' || v_user_id));
+
+    insert into change_log (user_id, entity, entity_id, op)
+    values (v_user_id, tg_table_name, v_id, case when tg_op = 'DELETE' then 'delete' else 'upsert' end);
+
+    return null;
+end;
+$$;
+
+create or replace trigger trg_expenses_change_log
+    after insert or update or delete on expenses
+    for each row execute function log_change();
+
+create or replace trigger trg_budgets_change_log
+    after insert or update or delete on budgets
+    for each row execute function log_change();
+
+-- 참조 수만 바뀌는 갱신은 응답 열이 그대로이므로 기록하지 않음
+create or replace trigger trg_categories_change_log
+    after insert or delete or update of name, color, updated_at on categories
+    for each row execute function log_change();
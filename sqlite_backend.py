@@ -0,0 +1,638 @@
+"""
+내장 SQLite 저장소 백엔드
+
+PostgREST 클라이언트와 같은 table/filter/order/limit 체인 API를 제공하므로
+라우터는 백엔드 종류와 관계없이 같은 코드로 동작합니다.
+모든 쿼리는 전용 스레드 하나에서 실행되어 이벤트 루프를 막지 않습니다.
+"""
+
+import asyncio
+import re
+import sqlite3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# 스키마 버전별 마이그레이션 (PRAGMA user_version 기준으로 순서대로 적용)
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS expenses (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        date TEXT NOT NULL,
+        description TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses (user_id, date);
+    CREATE INDEX IF NOT EXISTS idx_expenses_user_category ON expenses (user_id, category);
+
+    CREATE TABLE IF NOT EXISTS budgets (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        period TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_budgets_user_period ON budgets (user_id, year, month, period);
+
+    CREATE TABLE IF NOT EXISTS categories (
+        id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        color TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_categories_user_name ON categories (user_id, name);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS expense_rollups (
+        user_id TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        total_amount REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, year, month, category)
+    ) WITHOUT ROWID;
+    INSERT INTO expense_rollups (user_id, year, month, category, total_amount, count)
+        SELECT user_id, CAST(substr(date, 1, 4) AS INTEGER), CAST(substr(date, 6, 2) AS INTEGER),
+               category, SUM(amount), COUNT(*)
+        FROM expenses GROUP BY 1, 2, 3, 4;
+    """,
+    """
+    DROP INDEX IF EXISTS idx_expenses_user_date;
+    CREATE INDEX IF NOT EXISTS idx_expenses_user_date_id ON expenses (user_id, date, id);
+    """,
+    """
+    DELETE FROM budgets WHERE rowid NOT IN (
+        SELECT MAX(rowid) FROM budgets GROUP BY user_id, category, period, year, IFNULL(month, 0)
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_budgets_key ON budgets (user_id, category, period, year, IFNULL(month, 0));
+    """,
+    """
+    -- 카테고리 정수 코드 (AUTOINCREMENT라 삭제된 코드는 재사용되지 않음)와 참조 수
+    CREATE TABLE categories_v5 (
+        code INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        user_id TEXT NOT NULL,
+        name TEXT NOT NULL,
+        color TEXT NOT NULL,
+        expense_count INTEGER NOT NULL DEFAULT 0,
+        budget_count INTEGER NOT NULL DEFAULT 0,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    -- 이름이 같은 카테고리는 먼저 만든 것만 유지
+    INSERT INTO categories_v5 (id, user_id, name, color, created_at, updated_at)
+        SELECT id, user_id, name, color, created_at, updated_at FROM categories c
+        WHERE rowid = (SELECT MIN(rowid) FROM categories d WHERE d.user_id = c.user_id AND d.name = c.name)
+        ORDER BY rowid;
+    -- 지출/예산에만 있던 이름도 카테고리로 등록
+    INSERT INTO categories_v5 (id, user_id, name, color, created_at, updated_at)
+        SELECT lower(printf('%s-%s-%s-%s-%s', hex(randomblob(4)), hex(randomblob(2)), hex(randomblob(2)),
+                            hex(randomblob(2)), hex(randomblob(6)))),
+               u.user_id, u.category, '#6B7280',
+               strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'), strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+        FROM (SELECT user_id, category FROM expenses UNION SELECT user_id, category FROM budgets) u
+        WHERE NOT EXISTS (SELECT 1 FROM categories_v5 c WHERE c.user_id = u.user_id AND c.name = u.category);
+    DROP TABLE categories;
+    ALTER TABLE categories_v5 RENAME TO categories;
+    CREATE UNIQUE INDEX uq_categories_user_name ON categories (user_id, name);
+
+    -- 지출/예산/집계의 카테고리 이름을 코드로 교체
+    ALTER TABLE expenses ADD COLUMN category_id INTEGER REFERENCES categories (code);
+    UPDATE expenses SET category_id = (
+        SELECT code FROM categories c WHERE c.user_id = expenses.user_id AND c.name = expenses.category
+    );
+    DROP INDEX IF EXISTS idx_expenses_user_category;
+    ALTER TABLE expenses DROP COLUMN category;
+    CREATE INDEX idx_expenses_user_category ON expenses (user_id, category_id, date);
+
+    ALTER TABLE budgets ADD COLUMN category_id INTEGER REFERENCES categories (code);
+    UPDATE budgets SET category_id = (
+        SELECT code FROM categories c WHERE c.user_id = budgets.user_id AND c.name = budgets.category
+    );
+    DROP INDEX IF EXISTS uq_budgets_key;
+    ALTER TABLE budgets DROP COLUMN category;
+    CREATE UNIQUE INDEX uq_budgets_key ON budgets (user_id, category_id, period, year, IFNULL(month, 0));
+
+    CREATE TABLE expense_rollups_v5 (
+        user_id TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        month INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        total_amount REAL NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, year, month, category_id)
+    ) WITHOUT ROWID;
+    INSERT INTO expense_rollups_v5 (user_id, year, month, category_id, total_amount, count)
+        SELECT r.user_id, r.year, r.month, c.code, r.total_amount, r.count
+        FROM expense_rollups r JOIN categories c ON c.user_id = r.user_id AND c.name = r.category;
+    DROP TABLE expense_rollups;
+    ALTER TABLE expense_rollups_v5 RENAME TO expense_rollups;
+
+    -- 참조 수 초기화 후 트리거로 유지 (카테고리 삭제 가능 여부를 행 하나로 판단)
+    UPDATE categories SET
+        expense_count = (SELECT COUNT(*) FROM expenses e WHERE e.category_id = categories.code),
+        budget_count = (SELECT COUNT(*) FROM budgets b WHERE b.category_id = categories.code);
+
+    CREATE TRIGGER trg_expenses_category_insert AFTER INSERT ON expenses BEGIN
+        UPDATE categories SET expense_count = expense_count + 1 WHERE code = NEW.category_id;
+    END;
+    CREATE TRIGGER trg_expenses_category_delete AFTER DELETE ON expenses BEGIN
+        UPDATE categories SET expense_count = expense_count - 1 WHERE code = OLD.category_id;
+    END;
+    CREATE TRIGGER trg_expenses_category_update AFTER UPDATE OF category_id ON expenses
+    WHEN OLD.category_id IS NOT NEW.category_id BEGIN
+        UPDATE categories SET expense_count = expense_count - 1 WHERE code = OLD.category_id;
+        UPDATE categories SET expense_count = expense_count + 1 WHERE code = NEW.category_id;
+    END;
+    CREATE TRIGGER trg_budgets_category_insert AFTER INSERT ON budgets BEGIN
+        UPDATE categories SET budget_count = budget_count + 1 WHERE code = NEW.category_id;
+    END;
+    CREATE TRIGGER trg_budgets_category_delete AFTER DELETE ON budgets BEGIN
+        UPDATE categories SET budget_count = budget_count - 1 WHERE code = OLD.category_id;
+    END;
+    CREATE TRIGGER trg_budgets_category_update AFTER UPDATE OF category_id ON budgets
+    WHEN OLD.category_id IS NOT NEW.category_id BEGIN
+        UPDATE categories SET budget_count = budget_count - 1 WHERE code = OLD.category_id;
+        UPDATE categories SET budget_count = budget_count + 1 WHERE code = NEW.category_id;
+    END;
+    """,
+    """
+    -- 증분 동기화용 변경 기록 (AUTOINCREMENT라 번호가 재사용되지 않음)
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        entity TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        op TEXT NOT NULL,
+        changed_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_change_log_user_seq ON change_log (user_id, seq);
+    """,
+    """
+    -- 변경 기록을 데이터 쓰기와 같은 트랜잭션에서 트리거로 추가 (기록만 빠지는 일 방지)
+    -- 카테고리는 참조 수만 바뀌는 갱신은 응답 열이 그대로이므로 기록하지 않음
+    CREATE TRIGGER trg_expenses_change_insert AFTER INSERT ON expenses BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (NEW.user_id, 'expenses', NEW.id, 'upsert', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_expenses_change_update AFTER UPDATE ON expenses BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (NEW.user_id, 'expenses', NEW.id, 'upsert', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_expenses_change_delete AFTER DELETE ON expenses BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (OLD.user_id, 'expenses', OLD.id, 'delete', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_budgets_change_insert AFTER INSERT ON budgets BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (NEW.user_id, 'budgets', NEW.id, 'upsert', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_budgets_change_update AFTER UPDATE ON budgets BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (NEW.user_id, 'budgets', NEW.id, 'upsert', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_budgets_change_delete AFTER DELETE ON budgets BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (OLD.user_id, 'budgets', OLD.id, 'delete', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_categories_change_insert AFTER INSERT ON categories BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (NEW.user_id, 'categories', NEW.id, 'upsert', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_categories_change_update AFTER UPDATE OF name, color, updated_at ON categories BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (NEW.user_id, 'categories', NEW.id, 'upsert', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    CREATE TRIGGER trg_categories_change_delete AFTER DELETE ON categories BEGIN
+        INSERT INTO change_log (user_id, entity, entity_id, op, changed_at)
+        VALUES (OLD.user_id, 'categories', OLD.id, 'delete', strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'));
+    END;
+    """,
+]
+
+# 고유 키에 포함된 NULL 허용 열 - 표현식 인덱스로 NULL끼리도 같은 값으로 취급
+# (PostgreSQL의 NULLS NOT DISTINCT 고유 인덱스에 대응, upsert 충돌 대상도 같은 표현식 사용)
+NULLABLE_KEY_COLUMNS = {
+    ("budgets", "month"): "IFNULL(month, 0)",
+}
+
+# rpc()로 호출할 수 있는 함수 목록 - func(conn, params)
+FUNCTIONS = {}
+
+def register(name):
+    """SQLite 백엔드용 rpc 함수 등록 데코레이터"""
+    def decorator(func):
+        FUNCTIONS[name] = func
+        return func
+    return decorator
+
+# 한 문장에 바인딩할 수 있는 최대 파라미터 수 (SQLITE_MAX_VARIABLE_NUMBER 이하)
+MAX_VARIABLES = 32000
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _quote(name):
+    """컬럼/테이블 이름 검증 (SQL 인젝션 방지)"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"잘못된 식별자입니다: {name}")
+    return f'"{name}"'
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+class SQLiteResponse:
+    """postgrest.APIResponse와 같은 모양의 결과 객체"""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+class SQLiteQuery:
+    """PostgREST 요청 빌더와 호환되는 쿼리 빌더"""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table_name = table
+        self._table = _quote(table)
+        self._action = "select"
+        self._columns = "*"
+        self._payload = None
+        self._filters = []
+        self._params = []
+        self._orders = []
+        self._limit = None
+        self._offset = None
+        self._on_conflict = None
+        self._ignore_duplicates = False
+
+    # --- 동작 ---
+    def select(self, *columns, count=None):
+        self._action = "select"
+        names = [c.strip() for col in columns for c in col.split(",") if c.strip()]
+        if names and names != ["*"]:
+            self._columns = ", ".join(_quote(c) for c in names)
+        return self
+
+    def insert(self, json, **kwargs):
+        self._action = "insert"
+        self._payload = json if isinstance(json, list) else [json]
+        return self
+
+    def upsert(self, json, *, ignore_duplicates=False, on_conflict="", **kwargs):
+        """고유 키(on_conflict 열)가 같은 행이 있으면 수정, 없으면 삽입"""
+        self.insert(json)
+        self._on_conflict = [c.strip() for c in on_conflict.split(",") if c.strip()]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, json, **kwargs):
+        self._action = "update"
+        self._payload = json
+        return self
+
+    def delete(self, **kwargs):
+        self._action = "delete"
+        return self
+
+    # --- 필터 ---
+    def _filter(self, column, op, value):
+        self._filters.append(f"{_quote(column)} {op} ?")
+        self._params.append(value)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "=", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "!=", value)
+
+    def gt(self, column, value):
+        return self._filter(column, ">", value)
+
+    def gte(self, column, value):
+        return self._filter(column, ">=", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "<", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "<=", value)
+
+    def is_(self, column, value):
+        if value in (None, "null"):
+            self._filters.append(f"{_quote(column)} IS NULL")
+            return self
+        return self._filter(column, "IS", value)
+
+    def in_(self, column, values):
+        values = list(values)
+        if not values:
+            self._filters.append("0")
+            return self
+        self._filters.append(f"{_quote(column)} IN ({', '.join('?' for _ in values)})")
+        self._params.extend(values)
+        return self
+
+    # --- 정렬/페이지 ---
+    def order(self, column, *, desc=False, nullsfirst=False, foreign_table=None):
+        self._orders.append(f"{_quote(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self._limit = int(size)
+        return self
+
+    def offset(self, size):
+        self._offset = int(size)
+        return self
+
+    def range(self, start, end):
+        self._offset = int(start)
+        self._limit = int(end) - int(start) + 1
+        return self
+
+    # --- SQL 생성 ---
+    def _where(self):
+        return f" WHERE {' AND '.join(self._filters)}" if self._filters else ""
+
+    def _build(self):
+        if self._action == "select":
+            sql = f"SELECT {self._columns} FROM {self._table}{self._where()}"
+            if self._orders:
+                sql += f" ORDER BY {', '.join(self._orders)}"
+            if self._limit is not None or self._offset is not None:
+                sql += f" LIMIT {self._limit if self._limit is not None else -1}"
+                if self._offset is not None:
+                    sql += f" OFFSET {self._offset}"
+            return [(sql, self._params)]
+
+        if self._action == "insert":
+            # 같은 컬럼 구성의 행끼리 묶어 다중 행 INSERT 하나로 실행
+            now = _now()
+            groups = {}
+            for row in self._payload:
+                row = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **row}
+                groups.setdefault(tuple(row), []).append(row)
+            statements = []
+            for keys, rows in groups.items():
+                columns = ", ".join(_quote(k) for k in keys)
+                marks = f"({', '.join('?' for _ in keys)})"
+                conflict = self._conflict_clause(keys)
+                chunk = max(1, MAX_VARIABLES // len(keys))
+                for start in range(0, len(rows), chunk):
+                    part = rows[start:start + chunk]
+                    statements.append((
+                        f"INSERT INTO {self._table} ({columns}) VALUES "
+                        f"{', '.join(marks for _ in part)}{conflict} RETURNING *",
+                        [row[k] for row in part for k in keys],
+                    ))
+            return statements
+
+        if self._action == "update":
+            data = {**self._payload, "updated_at": _now()}
+            assignments = ", ".join(f"{_quote(k)} = ?" for k in data)
+            return [(
+                f"UPDATE {self._table} SET {assignments}{self._where()} RETURNING *",
+                list(data.values()) + self._params,
+            )]
+
+        if self._action == "delete":
+            return [(f"DELETE FROM {self._table}{self._where()} RETURNING *", self._params)]
+
+        raise ValueError(f"지원하지 않는 동작입니다: {self._action}")
+
+    def _conflict_clause(self, keys):
+        if not self._on_conflict:
+            return ""
+        target = ", ".join(
+            NULLABLE_KEY_COLUMNS.get((self._table_name, c), _quote(c)) for c in self._on_conflict
+        )
+        if self._ignore_duplicates:
+            return f" ON CONFLICT ({target}) DO NOTHING"
+        # 기존 행의 id/created_at은 유지하고 나머지 열만 새 값으로 교체
+        updates = [k for k in keys if k not in self._on_conflict and k not in ("id", "created_at")]
+        assignments = ", ".join(f"{_quote(k)} = excluded.{_quote(k)}" for k in updates)
+        return f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+    async def execute(self):
+        return await self._client.run(self._client.execute_statements, self._build())
+
+class SQLiteRPC:
+    """rpc() 호출 빌더 - 등록된 파이썬 함수를 같은 스레드에서 실행"""
+
+    def __init__(self, client, name, params):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    async def execute(self):
+        func = FUNCTIONS.get(self._name)
+        if func is None:
+            raise ValueError(f"정의되지 않은 함수입니다: {self._name}")
+        return SQLiteResponse(await self._client.run(func, self._client.conn, self._params))
+
+class SQLiteClient:
+    """PostgREST 클라이언트를 대신하는 내장 SQLite 클라이언트"""
+
+    def __init__(self, path):
+        self.path = path
+        # sqlite 연결은 하나의 스레드에서만 사용 (쓰기 직렬화)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+        self.conn = self._executor.submit(self._connect).result()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        self._migrate(conn)
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for index, script in enumerate(MIGRATIONS[version:], start=version + 1):
+            conn.executescript(f"BEGIN;\n{script}\nPRAGMA user_version = {index};\nCOMMIT;")
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def execute_statements(self, statements):
+        rows = []
+        if len(statements) > 1:
+            self.conn.execute("BEGIN")
+        try:
+            for sql, params in statements:
+                rows.extend(dict(row) for row in self.conn.execute(sql, params).fetchall())
+            if len(statements) > 1:
+                self.conn.execute("COMMIT")
+        except Exception:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+        return SQLiteResponse(rows)
+
+    def table(self, table):
+        return SQLiteQuery(self, table)
+
+    def from_(self, table):
+        return self.table(table)
+
+    def rpc(self, func, params):
+        return SQLiteRPC(self, func, params)
+
+    async def aclose(self):
+        await self.run(self.conn.close)
+        self._executor.shutdown(wait=False)
+
+# --- rpc 함수 (sql/functions.sql의 PostgreSQL 함수와 동일한 결과) ---
+
+@register("monthly_expense_summary")
+def monthly_expense_summary(conn, params):
+    sql = """
+        SELECT substr(date, 1, 7) AS month, SUM(amount) AS total_amount
+        FROM expenses
+        WHERE user_id = ?
+    """
+    args = [params["p_user_id"]]
+    if params.get("p_year"):
+        sql += " AND date >= ? AND date <= ?"
+        args += [f"{params['p_year']}-01-01", f"{params['p_year']}-12-31"]
+    sql += " GROUP BY month ORDER BY month"
+    return [dict(row) for row in conn.execute(sql, args).fetchall()]
+
+@register("category_expense_summary")
+def category_expense_summary(conn, params):
+    sql = """
+        SELECT category_id, SUM(amount) AS total_amount, COUNT(*) AS count, AVG(amount) AS avg_amount
+        FROM expenses
+        WHERE user_id = ?
+    """
+    args = [params["p_user_id"]]
+    year, month = params.get("p_year"), params.get("p_month")
+    if year:
+        # 날짜 범위 조건으로 (user_id, date) 인덱스 사용
+        start = f"{year}-{month or 1:02d}-01"
+        end = f"{year}-{month + 1:02d}-01" if month and month < 12 else f"{year + 1}-01-01"
+        sql += " AND date >= ? AND date < ?"
+        args += [start, end]
+    elif month:
+        sql += " AND substr(date, 6, 2) = ?"
+        args.append(f"{month:02d}")
+    sql += " GROUP BY category_id ORDER BY total_amount DESC"
+    return [dict(row) for row in conn.execute(sql, args).fetchall()]
+
+@register("apply_expense_batch")
+def apply_expense_batch(conn, params):
+    """지출 생성/수정/삭제를 한 트랜잭션으로 적용 (대상이 하나라도 없으면 아무것도 적용하지 않음)"""
+    user_id = params["p_user_id"]
+    creates = params.get("p_creates") or []
+    updates = params.get("p_updates") or []
+    deletes = params.get("p_deletes") or []
+    targets = [op["id"] for op in updates + deletes]
+
+    conn.execute("BEGIN")
+    try:
+        existing = {}
+        for i in range(0, len(targets), MAX_VARIABLES - 1):
+            chunk = targets[i:i + MAX_VARIABLES - 1]
+            rows = conn.execute(
+                f"SELECT * FROM expenses WHERE user_id = ? AND id IN ({', '.join('?' * len(chunk))})",
+                [user_id, *chunk]
+            ).fetchall()
+            existing.update((row["id"], dict(row)) for row in rows)
+        missing = [target for target in targets if target not in existing]
+        if missing:
+            conn.execute("ROLLBACK")
+            return {"missing": missing}
+
+        now = _now()
+        created = [
+            dict(conn.execute("""
+                INSERT INTO expenses (id, user_id, amount, category_id, date, description, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                RETURNING *
+            """, [op["id"], user_id, op["amount"], op["category_id"], op["date"], op.get("description"), now, now]).fetchone())
+            for op in creates
+        ]
+
+        updated = []
+        for op in updates:
+            fields = {k: op[k] for k in ("amount", "category_id", "date", "description") if k in op}
+            fields["updated_at"] = now
+            row = conn.execute(
+                f"UPDATE expenses SET {', '.join(f'{_quote(k)} = ?' for k in fields)} "
+                "WHERE id = ? AND user_id = ? RETURNING *",
+                [*fields.values(), op["id"], user_id]
+            ).fetchone()
+            updated.append({"old": existing[op["id"]], "new": dict(row)})
+
+        deleted = []
+        delete_ids = [op["id"] for op in deletes]
+        for i in range(0, len(delete_ids), MAX_VARIABLES - 1):
+            chunk = delete_ids[i:i + MAX_VARIABLES - 1]
+            deleted += [dict(row) for row in conn.execute(
+                f"DELETE FROM expenses WHERE user_id = ? AND id IN ({', '.join('?' * len(chunk))}) RETURNING *",
+                [user_id, *chunk]
+            ).fetchall()]
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return {"created": created, "updated": updated, "deleted": deleted, "missing": []}
+
+@register("bump_expense_rollup")
+def bump_expense_rollup(conn, params):
+    key = [params["p_user_id"], params["p_year"], params["p_month"], params["p_category_id"]]
+    conn.execute("BEGIN")
+    try:
+        rows = conn.execute("""
+            INSERT INTO expense_rollups (user_id, year, month, category_id, total_amount, count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, year, month, category_id) DO UPDATE SET
+                total_amount = total_amount + excluded.total_amount,
+                count = count + excluded.count
+            RETURNING *
+        """, key + [params["p_amount"], params["p_count"]]).fetchall()
+        conn.execute("""
+            DELETE FROM expense_rollups
+            WHERE user_id = ? AND year = ? AND month = ? AND category_id = ? AND count <= 0
+        """, key)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return [dict(row) for row in rows]
+
+@register("rebuild_expense_rollups")
+def rebuild_expense_rollups(conn, params):
+    user_id = params.get("p_user_id")
+    where = "WHERE user_id = ?" if user_id else ""
+    args = [user_id] if user_id else []
+    conn.execute("BEGIN")
+    try:
+        conn.execute(f"DELETE FROM expense_rollups {where}", args)
+        count = conn.execute(f"""
+            INSERT INTO expense_rollups (user_id, year, month, category_id, total_amount, count)
+            SELECT user_id, CAST(substr(date, 1, 4) AS INTEGER), CAST(substr(date, 6, 2) AS INTEGER),
+                   category_id, SUM(amount), COUNT(*)
+            FROM expenses {where} GROUP BY 1, 2, 3, 4
+        """, args).rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return count
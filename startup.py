@@ -0,0 +1,116 @@
+"""
+서버 시작 시간 측정과 준비 상태
+
+main이 가장 먼저 import해 기준 시각을 기록하고, 모듈 import와 백엔드 초기화
+(클라이언트 생성, 기능 감지) 단계별 소요 시간을 모읍니다. /health/ready가
+이 보고서를 백엔드 왕복 지연과 함께 반환합니다.
+
+모듈별 import/초기화 비용 보고서 (새 프로세스에서 측정):
+    python -m startup [상위 개수]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+_started = time.perf_counter()
+_phases = {}
+_state = {"status": "starting", "error": None}
+
+def _elapsed_ms(since):
+    return round((time.perf_counter() - since) * 1000, 1)
+
+def mark(name):
+    """기준 시각부터 지금까지를 단계 소요 시간으로 기록 (import 완료 등)"""
+    _phases[name] = _elapsed_ms(_started)
+
+@contextmanager
+def phase(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases[name] = _elapsed_ms(started)
+
+def mark_ready():
+    _state["status"] = "ready"
+    _state["error"] = None
+    mark("ready")
+
+def mark_failed(error):
+    _state["status"] = "failed"
+    _state["error"] = str(error) or type(error).__name__
+
+def is_ready():
+    return _state["status"] == "ready"
+
+def report():
+    return {
+        **_state,
+        "uptime_s": round(time.perf_counter() - _started, 1),
+        "phases_ms": dict(_phases),
+    }
+
+# 자식 프로세스: main import와 초기화를 실제로 수행하고 보고서를 JSON으로 출력
+_CHILD = """
+import asyncio, json, startup, main, database
+async def run():
+    await main.warm_up()
+    await database.close_async_client()
+asyncio.run(run())
+print(json.dumps(startup.report()))
+"""
+
+def _parse_importtime(stderr):
+    """-X importtime 출력에서 (모듈, 자체 us, 누적 us) 목록"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(own), int(cumulative)))
+    return rows
+
+def import_report(top=15):
+    """새 프로세스에서 측정한 {'modules': 프로젝트 모듈별, 'packages': 외부 패키지별, 'startup': 단계별}"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD],
+        cwd=root, capture_output=True, text=True, encoding="utf-8"
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    local = {name[:-3] for name in os.listdir(root) if name.endswith(".py")} | {"routers"}
+    modules = []
+    packages = {}
+    for name, own, cumulative in _parse_importtime(result.stderr):
+        package = name.split(".")[0]
+        if package in local:
+            modules.append({"module": name, "self_ms": own / 1000, "cumulative_ms": cumulative / 1000})
+        else:
+            packages[package] = packages.get(package, 0) + own / 1000
+
+    modules.sort(key=lambda x: x["cumulative_ms"], reverse=True)
+    heaviest = sorted(packages.items(), key=lambda x: x[1], reverse=True)[:top]
+    return {
+        "modules": modules,
+        "packages": [{"package": name, "self_ms": round(ms, 1)} for name, ms in heaviest],
+        "startup": json.loads(result.stdout.strip().splitlines()[-1]),
+    }
+
+if __name__ == "__main__":
+    data = import_report(int(sys.argv[1]) if len(sys.argv) > 1 else 15)
+
+    print("📦 프로젝트 모듈 import (누적/자체 ms)")
+    for row in data["modules"]:
+        print(f"  {row['module']:<24} {row['cumulative_ms']:>9.1f} {row['self_ms']:>9.1f}")
+    print("📚 외부 패키지 import (자체 ms 합계)")
+    for row in data["packages"]:
+        print(f"  {row['package']:<24} {row['self_ms']:>9.1f}")
+    print(f"🚀 초기화 단계 (ms, 상태: {data['startup']['status']})")
+    for name, ms in data["startup"]["phases_ms"].items():
+        print(f"  {name:<24} {ms:>9.1f}")
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# 앱 모듈을 가져오기 전에 임시 SQLite 저장소와 프로파일링을 설정 (모든 테스트가 같은 앱을 공유)
+os.environ["DB_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["PROFILING_ENABLED"] = "true"
+os.environ["PROFILE_INTERVAL"] = "0.2"
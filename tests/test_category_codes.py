@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from category_codes import DEFAULT_COLOR
+from main import app
+
+def test_unknown_category_name_creates_category():
+    with TestClient(app) as client:
+        client.post("/api/categories/initialize")
+        before = {category["name"] for category in client.get("/api/categories").json()}
+        assert "교통비" in before and "교통" not in before
+
+        # 이전 버전처럼 등록되지 않은 이름도 받고, 그 이름의 카테고리를 기본 색상으로 만듦
+        response = client.post("/api/expenses", json={"amount": 1000, "category": "교통", "date": "2026-10-01"})
+        assert response.status_code == 200
+        assert response.json()["data"]["category"] == "교통"
+
+        response = client.post("/api/budgets", json={
+            "category": "교통", "amount": 5000, "period": "monthly", "year": 2026, "month": 10
+        })
+        assert response.status_code == 200
+
+        categories = [category for category in client.get("/api/categories").json() if category["name"] == "교통"]
+        assert len(categories) == 1
+        assert categories[0]["color"] == DEFAULT_COLOR
+        assert {category["name"] for category in client.get("/api/categories").json()} == before | {"교통"}
+
+        summary = {row["category"]: row["total_amount"] for row in client.get("/api/expenses/summary/category").json()}
+        assert summary["교통"] == 1000
@@ -0,0 +1,25 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+def test_list_endpoint_profile_has_serialization():
+    with TestClient(app) as client:
+        client.post("/api/categories/initialize")
+        operations = [
+            {"op": "create", "data": {"amount": 1000 + i, "category": "식비", "date": f"2026-{i % 12 + 1:02d}-01"}}
+            for i in range(1000)
+        ]
+        assert client.post("/api/expenses/batch", json={"operations": operations}).status_code == 200
+
+        # 응답 행 검증(serialization 모듈의 TypedDict)과 orjson 인코딩이 serialization으로 분류되어야 함
+        phases = {"serialization": 0.0, "validation": 0.0}
+        for _ in range(3):
+            response = client.get("/api/expenses", params={"limit": 1000}, headers={"X-Profile": "1"})
+            assert response.status_code == 200
+            assert len(response.json()) == 1000
+            profile = client.get(f"/profiles/{response.headers['x-profile-id']}").json()
+            for phase in phases:
+                phases[phase] += profile["phases_ms"][phase]
+
+        assert phases["serialization"] > 0
+        assert phases["serialization"] >= phases["validation"]